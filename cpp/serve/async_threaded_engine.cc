@@ -9,6 +9,7 @@
 #include <tvm/runtime/packed_func.h>
 #include <tvm/runtime/registry.h>
 
+#include <algorithm>
 #include <atomic>
 #include <condition_variable>
 #include <mutex>
@@ -29,6 +30,8 @@ class AsyncThreadedEngineImpl : public AsyncThreadedEngine, public ModuleNode {
   TVM_MODULE_VTABLE_BEGIN("mlc.serve.async_threaded_engine");
   TVM_MODULE_VTABLE_ENTRY("add_request", &AsyncThreadedEngineImpl::AddRequest);
   TVM_MODULE_VTABLE_ENTRY("abort_request", &AsyncThreadedEngineImpl::AbortRequest);
+  TVM_MODULE_VTABLE_ENTRY("pause_scheduling", &AsyncThreadedEngineImpl::PauseScheduling);
+  TVM_MODULE_VTABLE_ENTRY("resume_scheduling", &AsyncThreadedEngineImpl::ResumeScheduling);
   TVM_MODULE_VTABLE_ENTRY("run_background_loop", &AsyncThreadedEngineImpl::RunBackgroundLoop);
   TVM_MODULE_VTABLE_ENTRY("exit_background_loop", &AsyncThreadedEngineImpl::ExitBackgroundLoop);
   if (_name == "init_background_engine") {
@@ -45,7 +48,6 @@ class AsyncThreadedEngineImpl : public AsyncThreadedEngine, public ModuleNode {
     {
       std::lock_guard<std::mutex> lock(mutex_);
       requests_to_add_.push_back(request);
-      ++pending_operation_cnt_;
     }
     cv_.notify_one();
   }
@@ -54,7 +56,22 @@ class AsyncThreadedEngineImpl : public AsyncThreadedEngine, public ModuleNode {
     {
       std::lock_guard<std::mutex> lock(mutex_);
       requests_to_abort_.push_back(request_id);
-      ++pending_operation_cnt_;
+    }
+    cv_.notify_one();
+  }
+
+  void PauseScheduling() final {
+    std::lock_guard<std::mutex> lock(mutex_);
+    ++pause_count_;
+  }
+
+  void ResumeScheduling() final {
+    {
+      std::lock_guard<std::mutex> lock(mutex_);
+      CHECK_GT(pause_count_, 0) << "The scheduling is resumed without being paused.";
+      if (--pause_count_ > 0) {
+        return;
+      }
     }
     cv_.notify_one();
   }
@@ -68,15 +85,31 @@ class AsyncThreadedEngineImpl : public AsyncThreadedEngine, public ModuleNode {
       {
         std::unique_lock<std::mutex> lock(mutex_);
         cv_.wait(lock, [this] {
-          return !background_engine_->Empty() || pending_operation_cnt_.load() > 0 ||
+          return !background_engine_->Empty() || !requests_to_abort_.empty() ||
+                 (pause_count_ == 0 && !requests_to_add_.empty()) ||
                  exit_now_.load(std::memory_order_relaxed);
         });
 
-        local_requests_to_add = requests_to_add_;
+        // Abortions are always processed. The requests to add are held
+        // back while scheduling is paused, and the running requests still
+        // proceed with the step below.
         local_requests_to_abort = requests_to_abort_;
-        requests_to_add_.clear();
         requests_to_abort_.clear();
-        pending_operation_cnt_ = 0;
+        if (pause_count_ == 0) {
+          local_requests_to_add = requests_to_add_;
+          requests_to_add_.clear();
+        } else {
+          local_requests_to_add.clear();
+          // Drop the held-back requests that are aborted before admission.
+          for (const String& request_id : local_requests_to_abort) {
+            requests_to_add_.erase(
+                std::remove_if(requests_to_add_.begin(), requests_to_add_.end(),
+                               [&request_id](const Request& request) {
+                                 return request->id == request_id;
+                               }),
+                requests_to_add_.end());
+          }
+        }
       }
       for (Request request : local_requests_to_add) {
         background_engine_->AddRequest(request);
@@ -121,10 +154,10 @@ class AsyncThreadedEngineImpl : public AsyncThreadedEngine, public ModuleNode {
    */
   std::vector<String> requests_to_abort_;
   /*!
-   * \brief Number of pending operations, should be the size of
-   * `requests_to_add_` and `requests_to_abort_`.
+   * \brief The number of active pauses of request admission. The requests
+   * to add are held back while it is positive. It is guarded by `mutex_`.
    */
-  std::atomic<int> pending_operation_cnt_ = 0;
+  int pause_count_ = 0;
 };
 
 TVM_REGISTER_GLOBAL("mlc.serve.create_threaded_engine").set_body_typed([]() {
@@ -45,6 +45,19 @@ class AsyncThreadedEngine {
 
   /*! \brief Abort the input request (specified by id string) from engine. */
   virtual void AbortRequest(const String& request_id) = 0;
+
+  /*!
+   * \brief Pause the admission of new requests. The requests added after
+   * pausing are held back until `ResumeScheduling` is invoked, so that a
+   * burst of requests can be admitted to the background engine at once
+   * and prefilled in the same batch. The requests that are already in the
+   * background engine keep running while paused, and abortions are not
+   * held back. Pauses can nest: the admission resumes only after every
+   * `PauseScheduling` is matched by a `ResumeScheduling`.
+   */
+  virtual void PauseScheduling() = 0;
+  /*! \brief Resume the admission of new requests paused by `PauseScheduling`. */
+  virtual void ResumeScheduling() = 0;
 };
 
 }  // namespace serve
@@ -77,6 +77,20 @@ TVM_REGISTER_GLOBAL("mlc.serve.TokenDataGetTokenIds").set_body_typed([](TokenDat
   return data->token_ids;
 });
 
+TVM_REGISTER_GLOBAL("mlc.serve.TokenDataGetTokenIdsArray").set_body_typed([](TokenData data) {
+  // Copy the token ids into a CPU NDArray in one shot, so that the token
+  // ids can be read on the Python side without per-element FFI calls.
+  const IntTuple& token_ids = data->token_ids;
+  NDArray token_ids_array = NDArray::Empty({static_cast<int64_t>(token_ids.size())},
+                                           DataType::Int(64), DLDevice{kDLCPU, 0});
+  token_ids_array.CopyFromBytes(token_ids.data(), token_ids.size() * sizeof(int64_t));
+  return token_ids_array;
+});
+
+TVM_REGISTER_GLOBAL("mlc.serve.TokenDataGetLength").set_body_typed([](TokenData data) {
+  return data->GetLength();
+});
+
 }  // namespace serve
 }  // namespace llm
 }  // namespace mlc
@@ -11,6 +11,7 @@
 #include <tvm/runtime/packed_func.h>
 #include <tvm/runtime/registry.h>
 
+#include <algorithm>
 #include <tuple>
 
 #include "../tokenizers.h"
@@ -98,6 +99,20 @@ class EngineImpl : public Engine {
     }
   }
 
+  void ResetRequests() final {
+    std::vector<String> request_ids;
+    request_ids.reserve(estate_->request_states.size());
+    for (const auto& it : estate_->request_states) {
+      request_ids.push_back(it.first);
+    }
+    // Aborting a request removes it from the queues and the models.
+    for (const String& request_id : request_ids) {
+      AbortRequest(request_id);
+    }
+    ICHECK(estate_->running_queue.empty());
+    ICHECK(estate_->waiting_queue.empty());
+  }
+
   bool Empty() final { return estate_->request_states.empty(); }
 
   String Stats() final { return estate_->stats.AsJSON(); }
@@ -118,7 +133,8 @@ class EngineImpl : public Engine {
     // Append to the waiting queue and create the request state.
     estate_->waiting_queue.push_back(request);
     estate_->request_states.emplace(
-        request->id, RequestState(request, models_.size(), estate_->id_manager.GetNewId()));
+        request->id,
+        RequestState(request, models_.size(), estate_->id_manager.GetNewId(), tokenizer_));
   }
 
   void AbortRequest(const String& request_id) final {
@@ -156,7 +172,28 @@ class EngineImpl : public Engine {
 
   /*********************** Engine Action ***********************/
 
-  void Step() final {
+  void Step() final { StepImpl(); }
+
+  void RunUntilAllFinished(const Array<String>& request_ids) final {
+    auto f_has_unfinished = [this, &request_ids]() {
+      return std::any_of(request_ids.begin(), request_ids.end(), [this](const String& request_id) {
+        return estate_->request_states.count(request_id);
+      });
+    };
+    while (f_has_unfinished()) {
+      // Allow the caller to interrupt the loop (e.g., with Ctrl-C).
+      tvm::runtime::EnvCheckSignals();
+      CHECK(StepImpl()) << "The engine makes no progress while there are unfinished requests. "
+                           "The requests may not fit into the KV cache.";
+    }
+  }
+
+ private:
+  /*!
+   * \brief Run one step of the engine.
+   * \return Whether any action processed requests in this step.
+   */
+  bool StepImpl() {
     CHECK(request_stream_callback_.defined())
         << "The request stream callback is not set. Engine cannot execute.";
     for (EngineAction action : actions_) {
@@ -164,15 +201,15 @@ class EngineImpl : public Engine {
       if (!processed_requests.empty()) {
         ActionStepPostProcess(processed_requests, estate_, models_,
                               request_stream_callback_.value(), max_single_sequence_length_);
-        return;
+        return true;
       }
     }
     ICHECK(estate_->running_queue.empty())
         << "Internal assumption violated: It is expected that an engine step takes at least one "
            "action (e.g. prefill, decode, etc.) but it does not.";
+    return false;
   }
 
- private:
   // Engine state, managing requests and request states.
   EngineState estate_;
   // Configurations and singletons
@@ -269,10 +306,14 @@ class EngineModule : public ModuleNode {
   TVM_MODULE_VTABLE_BEGIN("mlc.serve.engine");
   TVM_MODULE_VTABLE_ENTRY_PACKED("init", &EngineModule::InitPacked);
   TVM_MODULE_VTABLE_ENTRY("add_request", &EngineModule::AddRequest);
+  TVM_MODULE_VTABLE_ENTRY("add_requests", &EngineModule::AddRequests);
+  TVM_MODULE_VTABLE_ENTRY("add_requests_raw", &EngineModule::AddRequestsRaw);
   TVM_MODULE_VTABLE_ENTRY("abort_request", &EngineModule::Abort);
   TVM_MODULE_VTABLE_ENTRY("step", &EngineModule::Step);
+  TVM_MODULE_VTABLE_ENTRY("run_until_all_finished", &EngineModule::RunUntilAllFinished);
   TVM_MODULE_VTABLE_ENTRY("stats", &EngineModule::Stats);
   TVM_MODULE_VTABLE_ENTRY("reset", &EngineModule::Reset);
+  TVM_MODULE_VTABLE_ENTRY("reset_requests", &EngineModule::ResetRequests);
   TVM_MODULE_VTABLE_ENTRY("get_request_stream_callback", &EngineModule::GetRequestStreamCallback);
   TVM_MODULE_VTABLE_ENTRY("set_request_stream_callback", &EngineModule::SetRequestStreamCallback);
   TVM_MODULE_VTABLE_END();
@@ -283,10 +324,63 @@ class EngineModule : public ModuleNode {
   static tvm::runtime::Module Create() { return Module(make_object<EngineModule>()); }
   /*! \brief Redirection to `Engine::AddRequest`. */
   void AddRequest(Request request) { return GetEngine()->AddRequest(std::move(request)); }
+  /*! \brief Add a batch of requests in one call, redirecting to `Engine::AddRequest`. */
+  void AddRequests(Array<Request> requests) {
+    Engine* engine = GetEngine();
+    for (Request request : requests) {
+      engine->AddRequest(std::move(request));
+    }
+  }
+  /*!
+   * \brief Construct requests from raw inputs and add them to the engine.
+   * \param request_ids The id of each request.
+   * \param prompts The prompt of each request, either a text string or a tuple of token ids.
+   * \param generation_cfg_jsons The generation config of each request in JSON string.
+   * A single config means the config is shared by all requests.
+   * \param detokenize Whether to detokenize the generated tokens into delta text.
+   * \note The integer id of each request is set to its index in the batch.
+   */
+  void AddRequestsRaw(Array<String> request_ids, Array<ObjectRef> prompts,
+                      Array<String> generation_cfg_jsons, bool detokenize) {
+    CHECK_EQ(request_ids.size(), prompts.size())
+        << "The number of request ids and the number of prompts mismatch.";
+    CHECK(generation_cfg_jsons.size() == 1 || generation_cfg_jsons.size() == prompts.size())
+        << "Expecting either one generation config shared by all requests or one generation "
+           "config for each request, but got "
+        << generation_cfg_jsons.size() << " generation configs for " << prompts.size()
+        << " requests.";
+    std::vector<GenerationConfig> generation_cfgs;
+    generation_cfgs.reserve(generation_cfg_jsons.size());
+    for (String generation_cfg_json : generation_cfg_jsons) {
+      generation_cfgs.push_back(GenerationConfig(std::move(generation_cfg_json)));
+    }
+
+    Engine* engine = GetEngine();
+    for (int i = 0; i < static_cast<int>(prompts.size()); ++i) {
+      Data input;
+      if (const auto* text = prompts[i].as<StringObj>()) {
+        input = TextData(GetRef<String>(text));
+      } else if (const auto* token_ids = prompts[i].as<ShapeTupleObj>()) {
+        input = TokenData(GetRef<IntTuple>(token_ids));
+      } else {
+        LOG(FATAL) << "ValueError: The prompt is expected to be either a text string or a tuple "
+                      "of token ids, but got "
+                   << prompts[i]->GetTypeKey();
+      }
+      // The index of each request in the batch is used as its integer id.
+      engine->AddRequest(Request(request_ids[i], {input},
+                                 generation_cfgs[generation_cfgs.size() == 1 ? 0 : i], i,
+                                 detokenize));
+    }
+  }
   /*! \brief Redirection to `Engine::AbortRequest`. */
   void Abort(const String& request_id) { return GetEngine()->AbortRequest(request_id); }
   /*! \brief Redirection to `Engine::Step`. */
   void Step() { return GetEngine()->Step(); }
+  /*! \brief Redirection to `Engine::RunUntilAllFinished`. */
+  void RunUntilAllFinished(Array<String> request_ids) {
+    return GetEngine()->RunUntilAllFinished(request_ids);
+  }
   /*! \brief Redirection to `Engine::GetRequestStreamCallback`. */
   Optional<PackedFunc> GetRequestStreamCallback() {
     return GetEngine()->GetRequestStreamCallback();
@@ -297,6 +391,8 @@ class EngineModule : public ModuleNode {
   }
   /*! \brief Redirection to `Engine::Reset`. */
   void Reset() { return GetEngine()->Reset(); }
+  /*! \brief Redirection to `Engine::ResetRequests`. */
+  void ResetRequests() { return GetEngine()->ResetRequests(); }
   /*! \brief Redirection to `Engine::Stats` */
   String Stats() { return GetEngine()->Stats(); }
 
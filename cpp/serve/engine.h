@@ -73,6 +73,13 @@ class Engine {
   /*! \brief Reset the engine, clean up all running data and statistics. */
   virtual void Reset() = 0;
 
+  /*!
+   * \brief Abort all the running and pending requests, and release
+   * their KV cache entries. Unlike `Reset`, the KV cache itself and
+   * the statistics are kept.
+   */
+  virtual void ResetRequests() = 0;
+
   /*! \brief Check if the engine has no request to process. */
   virtual bool Empty() = 0;
 
@@ -106,6 +113,16 @@ class Engine {
    * generation results for those finished requests.
    */
   virtual void Step() = 0;
+
+  /*!
+   * \brief Keep taking engine steps until all the requests specified
+   * by the input ids have finished (or have been aborted).
+   * The request stream callback is invoked inline along the way.
+   * Signals (e.g., keyboard interrupt) are checked between steps, and an
+   * error is raised when a step makes no progress on the requests.
+   * \param request_ids The ids of the requests to wait for.
+   */
+  virtual void RunUntilAllFinished(const Array<String>& request_ids) = 0;
 };
 
 /*!
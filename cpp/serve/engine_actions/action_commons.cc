@@ -45,13 +45,34 @@ void ProcessFinishedRequest(Array<Request> finished_requests, EngineState estate
   }
 }
 
+/*!
+ * \brief Clear the reused stream output buffer. The allocated storage is
+ * kept when the buffer is not referenced elsewhere.
+ */
+void ClearStreamOutputsBuffer(Array<RequestStreamOutput>* buffer) {
+  if (buffer->empty()) {
+    return;
+  }
+  if (buffer->unique()) {
+    // Keep the allocated storage for the next step.
+    buffer->clear();
+  } else {
+    // The callback holds the array (e.g., for deferred processing),
+    // so a new array is used for the next step instead of copying.
+    *buffer = Array<RequestStreamOutput>();
+  }
+}
+
 void ActionStepPostProcess(Array<Request> requests, EngineState estate, Array<Model> models,
                            FRequestStreamCallback request_stream_callback,
                            int max_single_sequence_length) {
   Array<Request> finished_requests;
   finished_requests.reserve(requests.size());
 
-  Array<RequestStreamOutput> callback_delta_outputs;
+  Array<RequestStreamOutput>& callback_delta_outputs = estate->stream_outputs_buffer;
+  // Clear the buffer on entry, since it may keep stale outputs when the
+  // callback of the previous step raised an exception.
+  ClearStreamOutputsBuffer(&callback_delta_outputs);
   callback_delta_outputs.reserve(requests.size());
 
   // - Collect new generated tokens and finish reasons for requests.
@@ -67,13 +88,28 @@ void ActionStepPostProcess(Array<Request> requests, EngineState estate, Array<Mo
       continue;
     }
 
+    std::vector<int32_t> delta_token_ids(
+        rstate->mstates[0]->committed_tokens.begin() + rstate->next_callback_token_pos,
+        rstate->mstates[0]->committed_tokens.end());
+    rstate->next_callback_token_pos = num_committed_tokens;
+
+    // Detokenize the delta tokens and check the stop strings.
+    // The request finishes once any stop string is hit.
+    // The processor is skipped when the request needs no detokenization, or
+    // when it has already been flushed, which happens when the callback of an
+    // earlier step raised before the request was removed.
+    std::string delta_text;
+    if (rstate->stream_processor.defined() && !rstate->stream_processor.value()->Finished()) {
+      StreamProcessor stream_processor = rstate->stream_processor.value();
+      delta_text = stream_processor->Put(delta_token_ids, /*is_last=*/finish_reason.defined());
+      if (stream_processor->StopTriggered()) {
+        finish_reason = String("stop");
+      }
+    }
+
     callback_delta_outputs.push_back(RequestStreamOutput(
-        request->id,
-        TokenData(
-            IntTuple(rstate->mstates[0]->committed_tokens.begin() + rstate->next_callback_token_pos,
-                     rstate->mstates[0]->committed_tokens.end())),
+        request->id, request->int_id, TokenData(std::move(delta_token_ids)), delta_text,
         finish_reason));
-    rstate->next_callback_token_pos = num_committed_tokens;
 
     if (finish_reason.defined()) {
       finished_requests.push_back(request);
@@ -81,7 +117,21 @@ void ActionStepPostProcess(Array<Request> requests, EngineState estate, Array<Mo
   }
 
   // - Invoke the stream callback function once for all collected requests.
-  request_stream_callback(callback_delta_outputs);
+  // The callback is skipped when no request has new outputs in this step.
+  // The finished requests are removed even when the callback raises,
+  // so that they are not processed again in the next step.
+  if (!callback_delta_outputs.empty()) {
+    try {
+      request_stream_callback(callback_delta_outputs);
+    } catch (...) {
+      ClearStreamOutputsBuffer(&callback_delta_outputs);
+      ProcessFinishedRequest(std::move(finished_requests), std::move(estate), std::move(models),
+                             max_single_sequence_length);
+      throw;
+    }
+    // Release the outputs right after the callback.
+    ClearStreamOutputsBuffer(&callback_delta_outputs);
+  }
 
   ProcessFinishedRequest(std::move(finished_requests), std::move(estate), std::move(models),
                          max_single_sequence_length);
@@ -29,6 +29,7 @@ void RemoveRequestFromModel(EngineState estate, int64_t req_internal_id, Array<M
 /*!
  * \brief The request post-processing after an engine action step.
  * It includes
+ * - detokenize the new generated tokens and check the stop strings,
  * - invoke the request function callback to return new generated tokens,
  * - update the engine state for finished requests.
  * \note This function may remove requests from the `running_queue`.
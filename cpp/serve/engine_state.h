@@ -95,6 +95,12 @@ class EngineStateObj : public Object {
   EngineInternalIDManager id_manager;
   /*! \brief Runtime statistics. */
   EngineStats stats;
+  /*!
+   * \brief The scratch buffer of the delta outputs passed to the request
+   * stream callback, which is reused across engine steps to avoid
+   * allocating a new array in every step. It is empty between steps.
+   */
+  Array<RequestStreamOutput> stream_outputs_buffer;
 
   /*! \brief Reset the engine state and clear the statistics. */
   void Reset();
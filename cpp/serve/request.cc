@@ -18,7 +18,8 @@ namespace serve {
 
 TVM_REGISTER_OBJECT_TYPE(RequestNode);
 
-Request::Request(String id, Array<Data> inputs, GenerationConfig generation_cfg) {
+Request::Request(String id, Array<Data> inputs, GenerationConfig generation_cfg,
+                 int64_t int_id, bool detokenize) {
   CHECK(!inputs.empty()) << "No input data is given.";
   // Compute the total input length, or fall back to "-1" which means
   // unknown due to the existence of untokenized data.
@@ -34,6 +35,8 @@ Request::Request(String id, Array<Data> inputs, GenerationConfig generation_cfg)
 
   ObjectPtr<RequestNode> n = make_object<RequestNode>();
   n->id = std::move(id);
+  n->int_id = int_id;
+  n->detokenize = detokenize;
   n->inputs = std::move(inputs);
   n->input_total_length = input_total_length;
   n->generation_cfg = std::move(generation_cfg);
@@ -60,14 +63,16 @@ Request Request::FromUntokenized(const Request& request, const Tokenizer& tokeni
     ICHECK_NE(request->input_total_length, -1);
     return request;
   } else {
-    return Request(request->id, std::move(inputs), request->generation_cfg);
+    return Request(request->id, std::move(inputs), request->generation_cfg, request->int_id,
+                   request->detokenize);
   }
 }
 
 TVM_REGISTER_GLOBAL("mlc.serve.Request")
-    .set_body_typed([](String id, Array<Data> inputs, String generation_cfg_json) {
+    .set_body_typed([](String id, Array<Data> inputs, String generation_cfg_json,
+                       bool detokenize) {
       return Request(std::move(id), std::move(inputs),
-                     GenerationConfig(std::move(generation_cfg_json)));
+                     GenerationConfig(std::move(generation_cfg_json)), /*int_id=*/-1, detokenize);
     });
 
 TVM_REGISTER_GLOBAL("mlc.serve.RequestGetInputs").set_body_typed([](Request request) {
@@ -82,20 +87,33 @@ TVM_REGISTER_GLOBAL("mlc.serve.RequestGetGenerationConfigJSON").set_body_typed([
 
 TVM_REGISTER_OBJECT_TYPE(RequestStreamOutputObj);
 
-RequestStreamOutput::RequestStreamOutput(String request_id, TokenData delta_tokens,
+RequestStreamOutput::RequestStreamOutput(String request_id, int64_t request_int_id,
+                                         TokenData delta_tokens, String delta_text,
                                          Optional<String> finish_reason) {
   ObjectPtr<RequestStreamOutputObj> n = make_object<RequestStreamOutputObj>();
   n->request_id = std::move(request_id);
+  n->request_int_id = request_int_id;
   n->delta_tokens = std::move(delta_tokens);
+  n->delta_text = std::move(delta_text);
   n->finish_reason = std::move(finish_reason);
   data_ = std::move(n);
 }
 
 TVM_REGISTER_GLOBAL("mlc.serve.RequestStreamOutputUnpack")
     .set_body_typed([](RequestStreamOutput output) {
-      return Array<ObjectRef>{output->request_id, output->delta_tokens, output->finish_reason};
+      return Array<ObjectRef>{output->request_id, output->delta_tokens, output->delta_text,
+                              output->finish_reason};
     });
 
+TVM_REGISTER_GLOBAL("mlc.serve.RequestStreamOutputGetRequestIntId")
+    .set_body_typed([](RequestStreamOutput output) { return output->request_int_id; });
+
+TVM_REGISTER_GLOBAL("mlc.serve.RequestStreamOutputGetDeltaTokens")
+    .set_body_typed([](RequestStreamOutput output) { return output->delta_tokens; });
+
+TVM_REGISTER_GLOBAL("mlc.serve.RequestStreamOutputGetDeltaText")
+    .set_body_typed([](RequestStreamOutput output) { return output->delta_text; });
+
 }  // namespace serve
 }  // namespace llm
 }  // namespace mlc
@@ -37,6 +37,19 @@ class RequestNode : public Object {
    * Different requests should have different ids.
    */
   String id;
+  /*!
+   * \brief The integer identifier of the request, which is "-1" by default.
+   * It is assigned by the engine to the requests added in batch, and is
+   * streamed back in the request outputs, so that the callers can index
+   * their per-request states directly instead of looking up by string id.
+   */
+  int64_t int_id = -1;
+  /*!
+   * \brief Whether the generated tokens are detokenized into the delta text
+   * of the request stream outputs. When it is false and there is no stop
+   * string, detokenization is skipped and the delta text is always empty.
+   */
+  bool detokenize = true;
   /*!
    * \brief The user inputs of a request. Input may have multi-modality.
    * \sa data.h
@@ -62,7 +75,8 @@ class RequestNode : public Object {
 
 class Request : public ObjectRef {
  public:
-  explicit Request(String id, Array<Data> inputs, GenerationConfig generation_cfg);
+  explicit Request(String id, Array<Data> inputs, GenerationConfig generation_cfg,
+                   int64_t int_id = -1, bool detokenize = true);
 
   /*!
    * \brief Return a request object with all text data tokenized,
@@ -86,11 +100,19 @@ class RequestStreamOutputObj : public Object {
  public:
   /*! \brief The id of the request that the function is invoked for. */
   String request_id;
+  /*! \brief The integer id of the request, or "-1" if not assigned. */
+  int64_t request_int_id;
   /*!
    * \brief The new generated tokens since the last callback invocation
    * for the input request.
    */
   TokenData delta_tokens;
+  /*!
+   * \brief The detokenized text of the new generated tokens, which is
+   * UTF-8 valid and has been truncated at the first stop string (if any).
+   * It is empty when the request is not detokenized.
+   */
+  String delta_text;
   /*!
    * \brief The finish reason of the request when it is finished,
    * of None if the request has not finished yet.
@@ -109,8 +131,8 @@ class RequestStreamOutputObj : public Object {
  */
 class RequestStreamOutput : public ObjectRef {
  public:
-  explicit RequestStreamOutput(String request_id, TokenData delta_tokens,
-                               Optional<String> finish_reason);
+  explicit RequestStreamOutput(String request_id, int64_t request_int_id, TokenData delta_tokens,
+                               String delta_text, Optional<String> finish_reason);
 
   TVM_DEFINE_OBJECT_REF_METHODS(RequestStreamOutput, ObjectRef, RequestStreamOutputObj);
 };
@@ -56,7 +56,8 @@ void RequestModelStateNode::RemoveAllDraftTokens() {
 
 TVM_REGISTER_OBJECT_TYPE(RequestStateNode);
 
-RequestState::RequestState(Request request, int num_models, int64_t internal_id) {
+RequestState::RequestState(Request request, int num_models, int64_t internal_id,
+                           const Tokenizer& tokenizer) {
   ObjectPtr<RequestStateNode> n = make_object<RequestStateNode>();
   Array<RequestModelState> mstates;
   mstates.reserve(num_models);
@@ -64,6 +65,11 @@ RequestState::RequestState(Request request, int num_models, int64_t internal_id)
     mstates.push_back(RequestModelState(request, i, internal_id, request->inputs));
   }
   n->rng = RandomGenerator(request->generation_cfg->seed);
+  if (request->detokenize || !request->generation_cfg->stop_strs.empty()) {
+    n->stream_processor = StreamProcessor(
+        tokenizer,
+        {request->generation_cfg->stop_strs.begin(), request->generation_cfg->stop_strs.end()});
+  }
   n->request = std::move(request);
   n->mstates = std::move(mstates);
   n->next_callback_token_pos = 0;
@@ -83,8 +89,12 @@ Optional<String> RequestStateNode::GenerationFinished(int max_single_sequence_le
   // - Decode committed tokens.
   const std::vector<int32_t>& committed_tokens = mstates[0]->committed_tokens;
 
-  // NOTE: the handling of stop strings are not part of engine logic,
-  //       since we don't do detokenization in engine.
+  // NOTE: stop strings are checked against the detokenized text
+  //       when streaming back the outputs, see `ActionStepPostProcess`.
+  //       A request whose stop string was already hit is finished.
+  if (stream_processor.defined() && stream_processor.value()->StopTriggered()) {
+    return String("stop");
+  }
 
   // Case 1. Any of the stop tokens appears in the committed tokens ===> Finished
   // `stop_token_ids` includes the stop tokens from conversation template and user-provided tokens.
@@ -11,6 +11,8 @@
 #include <tvm/runtime/object.h>
 
 #include "../random.h"
+#include "../streamer.h"
+#include "../tokenizers.h"
 #include "config.h"
 #include "request.h"
 
@@ -129,6 +131,12 @@ class RequestStateNode : public Object {
    * next request stream callback invocation.
    */
   int next_callback_token_pos;
+  /*!
+   * \brief The stream processor that detokenizes the committed tokens
+   * and checks the stop strings in the detokenized text. It is not defined
+   * when the request needs no detokenization and has no stop string.
+   */
+  Optional<StreamProcessor> stream_processor;
 
   /*! \brief The time of adding the request to engine. */
   MLCTimePoint tadd;
@@ -152,7 +160,8 @@ class RequestStateNode : public Object {
 
 class RequestState : public ObjectRef {
  public:
-  explicit RequestState(Request request, int num_models, int64_t internal_id);
+  explicit RequestState(Request request, int num_models, int64_t internal_id,
+                        const Tokenizer& tokenizer);
 
   TVM_DEFINE_MUTABLE_OBJECT_REF_METHODS(RequestState, ObjectRef, RequestStateNode);
 };
@@ -8,6 +8,7 @@
 #include <tvm/runtime/registry.h>
 
 #include <algorithm>
+#include <queue>
 #include <string>
 
 #include "tokenizers.h"
@@ -162,6 +163,53 @@ StopStringHandlerObj::StopStringHandlerObj(std::vector<std::string> stop_strs)
   if (!stop_strs_.empty()) {
     CHECK_GT(max_stop_str_length_, 0);
   }
+  BuildAutomaton();
+}
+
+void StopStringHandlerObj::BuildAutomaton() {
+  automaton_children_.assign(1, {});
+  automaton_match_length_.assign(1, 0);
+  automaton_state_ = 0;
+  // - Insert all stop strings into the trie.
+  for (const std::string& stop_str : stop_strs_) {
+    int state = 0;
+    for (char ch : stop_str) {
+      auto it = automaton_children_[state].find(ch);
+      if (it == automaton_children_[state].end()) {
+        int new_state = automaton_children_.size();
+        automaton_children_[state][ch] = new_state;
+        automaton_children_.emplace_back();
+        automaton_match_length_.push_back(0);
+        state = new_state;
+      } else {
+        state = it->second;
+      }
+    }
+    automaton_match_length_[state] =
+        std::max(automaton_match_length_[state], static_cast<int>(stop_str.length()));
+  }
+  // - Compute the failure links in BFS order, and propagate the match
+  //   lengths along the failure links.
+  automaton_fail_.assign(automaton_children_.size(), 0);
+  std::queue<int> queue;
+  for (const auto& [ch, child] : automaton_children_[0]) {
+    queue.push(child);
+  }
+  while (!queue.empty()) {
+    int state = queue.front();
+    queue.pop();
+    for (const auto& [ch, child] : automaton_children_[state]) {
+      int fail = automaton_fail_[state];
+      while (fail != 0 && !automaton_children_[fail].count(ch)) {
+        fail = automaton_fail_[fail];
+      }
+      auto it = automaton_children_[fail].find(ch);
+      automaton_fail_[child] = it != automaton_children_[fail].end() ? it->second : 0;
+      automaton_match_length_[child] =
+          std::max(automaton_match_length_[child], automaton_match_length_[automaton_fail_[child]]);
+      queue.push(child);
+    }
+  }
 }
 
 /*!
@@ -172,7 +220,7 @@ StopStringHandlerObj::StopStringHandlerObj(std::vector<std::string> stop_strs)
 inline int FindUTF8CutoffPosition(const std::string& str, int pos) {
   static constexpr const char* error_msg = "The input string is invalid UTF-8 encoded.";
   ICHECK_GE(pos, 0);
-  ICHECK_LT(pos, static_cast<int>(str.length()));
+  ICHECK_LE(pos, static_cast<int>(str.length()));
 
   for (int i = 0; i < 4 && pos - i > 0; ++i) {
     unsigned char byte = static_cast<unsigned char>(str[pos - i - 1]);
@@ -208,12 +256,25 @@ std::string StopStringHandlerObj::Put(std::string input_delta_str) {
   if (stop_strs_.empty()) {
     return input_delta_str;
   }
+  int scan_begin = pending_str_.length();
   pending_str_ += input_delta_str;
 
-  // - Check if any stop strings appear.
+  // - Check if any stop strings appear by feeding the new characters
+  //   into the automaton. All the previous characters have been scanned,
+  //   and the pending string always keeps enough suffix for any stop
+  //   string ending in the new characters.
   size_t earliest_occurrence_pos = std::string::npos;
-  for (const std::string& stop_str : stop_strs_) {
-    earliest_occurrence_pos = std::min(earliest_occurrence_pos, pending_str_.find(stop_str));
+  for (int pos = scan_begin; pos < static_cast<int>(pending_str_.length()); ++pos) {
+    char ch = pending_str_[pos];
+    while (automaton_state_ != 0 && !automaton_children_[automaton_state_].count(ch)) {
+      automaton_state_ = automaton_fail_[automaton_state_];
+    }
+    auto it = automaton_children_[automaton_state_].find(ch);
+    automaton_state_ = it != automaton_children_[automaton_state_].end() ? it->second : 0;
+    if (int match_length = automaton_match_length_[automaton_state_]) {
+      earliest_occurrence_pos =
+          std::min(earliest_occurrence_pos, static_cast<size_t>(pos - match_length + 1));
+    }
   }
 
   // - Return the prefix if any stop strings appear.
@@ -266,5 +327,46 @@ TVM_REGISTER_GLOBAL("mlc.StopStringHandlerFinish")
 TVM_REGISTER_GLOBAL("mlc.StopStringHandlerStopTriggered")
     .set_body_method<StopStringHandler>(&StopStringHandlerObj::StopTriggered);
 
+/****************** StreamProcessor ******************/
+
+TVM_REGISTER_OBJECT_TYPE(StreamProcessorObj);
+
+StreamProcessorObj::StreamProcessorObj(Tokenizer tokenizer, std::vector<std::string> stop_strs)
+    : text_streamer_(std::move(tokenizer)), stop_str_handler_(std::move(stop_strs)) {}
+
+StreamProcessor::StreamProcessor(Tokenizer tokenizer, std::vector<std::string> stop_strs) {
+  data_ = make_object<StreamProcessorObj>(std::move(tokenizer), std::move(stop_strs));
+}
+
+std::string StreamProcessorObj::Put(const std::vector<int32_t>& delta_tokens, bool is_last) {
+  CHECK(!finished_) << "Cannot put new tokens into a finished StreamProcessor.";
+  std::string delta_text = stop_str_handler_->Put(text_streamer_->Put(delta_tokens));
+  if (is_last && !stop_str_handler_->StopTriggered()) {
+    delta_text += stop_str_handler_->Put(text_streamer_->Finish());
+    if (!stop_str_handler_->StopTriggered()) {
+      delta_text += stop_str_handler_->Finish();
+    }
+  }
+  finished_ = is_last || stop_str_handler_->StopTriggered();
+  return delta_text;
+}
+
+TVM_REGISTER_GLOBAL("mlc.StreamProcessor")
+    .set_body_typed([](Tokenizer tokenizer, Array<String> stop_strs) {
+      return StreamProcessor(std::move(tokenizer), {stop_strs.begin(), stop_strs.end()});
+    });
+
+TVM_REGISTER_GLOBAL("mlc.StreamProcessorPut")
+    .set_body_typed([](StreamProcessor processor, const IntTuple& delta_tokens, bool is_last) {
+      return processor->Put({delta_tokens->data, delta_tokens->data + delta_tokens->size},
+                            is_last);
+    });
+
+TVM_REGISTER_GLOBAL("mlc.StreamProcessorStopTriggered")
+    .set_body_method<StreamProcessor>(&StreamProcessorObj::StopTriggered);
+
+TVM_REGISTER_GLOBAL("mlc.StreamProcessorFinished")
+    .set_body_method<StreamProcessor>(&StreamProcessorObj::Finished);
+
 }  // namespace llm
 }  // namespace mlc
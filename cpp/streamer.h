@@ -9,6 +9,8 @@
 
 #include <tvm/runtime/object.h>
 
+#include <unordered_map>
+
 #include "tokenizers.h"
 
 namespace mlc {
@@ -72,6 +74,9 @@ class TextStreamer : public ObjectRef {
  * \brief The stop string handler in MLC LLM, which takes input delta text
  * one at a time, and return the output delta text before stopping due to
  * stop strings.
+ * \note All stop strings are compiled into a single Aho-Corasick automaton,
+ * so that each input character is scanned only once regardless of the
+ * number of stop strings.
  */
 class StopStringHandlerObj : public Object {
  public:
@@ -95,10 +100,25 @@ class StopStringHandlerObj : public Object {
   TVM_DECLARE_FINAL_OBJECT_INFO(StopStringHandlerObj, Object);
 
  private:
+  /*! \brief Build the Aho-Corasick automaton from the stop strings. */
+  void BuildAutomaton();
+
   std::vector<std::string> stop_strs_;
   int max_stop_str_length_;
   std::string pending_str_ = "";
   bool stop_triggered_ = false;
+
+  /*! \brief The trie transitions of each automaton state. State 0 is the root. */
+  std::vector<std::unordered_map<char, int>> automaton_children_;
+  /*! \brief The failure link of each automaton state. */
+  std::vector<int> automaton_fail_;
+  /*!
+   * \brief The length of the longest stop string that is a suffix of the
+   * string represented by each automaton state, or 0 if there is none.
+   */
+  std::vector<int> automaton_match_length_;
+  /*! \brief The automaton state after scanning all the input text so far. */
+  int automaton_state_ = 0;
 };
 
 /*!
@@ -112,6 +132,57 @@ class StopStringHandler : public ObjectRef {
   TVM_DEFINE_MUTABLE_OBJECT_REF_METHODS(StopStringHandler, ObjectRef, StopStringHandlerObj);
 };
 
+/****************** StreamProcessor ******************/
+
+/*!
+ * \brief The stream processor in MLC LLM, which fuses a text streamer and
+ * a stop string handler. It takes input delta tokens one at a time, and
+ * return the UTF-8-valid output delta text before stopping due to stop strings.
+ */
+class StreamProcessorObj : public Object {
+ public:
+  explicit StreamProcessorObj(Tokenizer tokenizer, std::vector<std::string> stop_strs);
+
+  /*!
+   * \brief Put new delta tokens into the processor, and get the output
+   * delta text before stopping.
+   * \param delta_tokens The new tokens to put into the processor.
+   * \param is_last Whether the input delta tokens are the last ones of
+   * the generation. If so, all the text held by the processor is flushed.
+   * \return The output delta text.
+   */
+  std::string Put(const std::vector<int32_t>& delta_tokens, bool is_last);
+
+  /*! \brief Check if the generation has stopped due to stop string. */
+  bool StopTriggered() { return stop_str_handler_->StopTriggered(); }
+
+  /*!
+   * \brief Check if the processor has finished, i.e., all its text has been
+   * flushed or the generation has stopped due to stop string. No more tokens
+   * can be put into a finished processor.
+   */
+  bool Finished() { return finished_; }
+
+  static constexpr const char* _type_key = "mlc.StreamProcessor";
+  TVM_DECLARE_FINAL_OBJECT_INFO(StreamProcessorObj, Object);
+
+ private:
+  TextStreamer text_streamer_;
+  StopStringHandler stop_str_handler_;
+  bool finished_ = false;
+};
+
+/*!
+ * \brief Managed reference to StreamProcessorObj
+ * \sa StreamProcessorObj
+ */
+class StreamProcessor : public ObjectRef {
+ public:
+  explicit StreamProcessor(Tokenizer tokenizer, std::vector<std::string> stop_strs);
+
+  TVM_DEFINE_MUTABLE_OBJECT_REF_METHODS(StreamProcessor, ObjectRef, StreamProcessorObj);
+};
+
 }  // namespace llm
 }  // namespace mlc
 
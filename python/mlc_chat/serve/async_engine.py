@@ -2,16 +2,16 @@
 Acknowledgment: Part of the code was adapted from the vLLM project.
 """
 import asyncio
+import contextlib
 import threading
-from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 import tvm
 
-from ..streamer import StopStringHandler, TextStreamer
 from ..tokenizer import Tokenizer
 from . import data
 from .config import EngineMode, GenerationConfig, KVCacheConfig
-from .engine import ModelInfo, _process_model_args
+from .engine import ModelInfo, _get_default_engine_mode, _process_model_args
 from .event_trace_recorder import EventTraceRecorder
 from .request import Request, RequestStreamOutput
 
@@ -93,7 +93,9 @@ class AsyncThreadedEngine:  # pylint: disable=too-many-instance-attributes
         The configuration of the paged KV cache.
 
     engine_mode : Optional[EngineMode]
-        The Engine execution mode.
+        The Engine execution mode. When not specified, speculative decoding
+        is enabled if multiple models are given, with the draft length from
+        the draft model (the second model) if it is a SpeculativeModelInfo.
 
     enable_tracing : bool
         A boolean indicating if to enable event logging for requests.
@@ -119,6 +121,8 @@ class AsyncThreadedEngine:  # pylint: disable=too-many-instance-attributes
             for key in [
                 "add_request",
                 "abort_request",
+                "pause_scheduling",
+                "resume_scheduling",
                 "run_background_loop",
                 "init_background_engine",
                 "exit_background_loop",
@@ -126,13 +130,10 @@ class AsyncThreadedEngine:  # pylint: disable=too-many-instance-attributes
         }
         self.tokenizer = Tokenizer(tokenizer_path)
         if engine_mode is None:
-            # The default engine mode: non-speculative
-            engine_mode = EngineMode()
+            engine_mode = _get_default_engine_mode(models)
 
         # The mapping from request ids to request asynchronous stream.
-        self._request_tools: Dict[
-            str, Tuple[AsyncRequestStream, TextStreamer, StopStringHandler]
-        ] = {}
+        self._request_tools: Dict[str, AsyncRequestStream] = {}
 
         def _background_loop():
             self._ffi["init_background_engine"](
@@ -160,6 +161,41 @@ class AsyncThreadedEngine:  # pylint: disable=too-many-instance-attributes
         self._ffi["exit_background_loop"]()
         self._background_loop_thread.join()
 
+    @contextlib.contextmanager
+    def pause_scheduling(self) -> Iterator[None]:
+        """The context within which the requests submitted are held back
+        from the background engine, and are admitted all at once when
+        exiting the context. This enables a burst of requests to be
+        prefilled in the same batch. The requests already running in the
+        background engine are not affected, and abortions take effect
+        immediately. The contexts can nest (e.g., from concurrent
+        `generate_stream` calls), in which case the requests are admitted
+        when the outermost context exits.
+
+        Examples
+        --------
+        .. code:: python
+
+            async def consume(stream):
+                return [delta_text async for delta_text, _, _ in stream]
+
+            with async_engine.pause_scheduling():
+                tasks = [
+                    asyncio.create_task(
+                        consume(async_engine.generate(prompt, generation_config, str(i)))
+                    )
+                    for i, prompt in enumerate(prompts)
+                ]
+                # Yield control so that the tasks submit their requests.
+                await asyncio.sleep(0)
+            outputs = await asyncio.gather(*tasks)
+        """
+        self._ffi["pause_scheduling"]()
+        try:
+            yield
+        finally:
+            self._ffi["resume_scheduling"]()
+
     async def generate(
         self, prompt: Union[str, List[int]], generation_config: GenerationConfig, request_id: str
     ) -> AsyncGenerator[Tuple[str, int, str], Any]:
@@ -205,11 +241,7 @@ class AsyncThreadedEngine:  # pylint: disable=too-many-instance-attributes
             )
         else:
             # Record the stream in the tracker
-            self._request_tools[request_id] = (
-                stream,
-                TextStreamer(self.tokenizer),
-                StopStringHandler(generation_config.stop_strs),
-            )
+            self._request_tools[request_id] = stream
             self._ffi["add_request"](request)
 
         # Iterate the stream asynchronously and yield the token.
@@ -220,6 +252,70 @@ class AsyncThreadedEngine:  # pylint: disable=too-many-instance-attributes
             await self.abort(request_id)
             raise e
 
+    async def generate_stream(
+        self,
+        prompts: Sequence[Union[str, List[int]]],
+        generation_config: GenerationConfig,
+        request_id: str,
+    ) -> AsyncGenerator[Tuple[int, str, int, Optional[str]], Any]:
+        """Asynchronous batch text generation interface.
+        The requests of all prompts are admitted to the engine at once,
+        and the delta outputs of the requests are streamed back in the
+        order they are generated. Each yielded tuple is contained of
+        - the index of the prompt that the output belongs to, in type int,
+        - the delta text in type str,
+        - the number of delta tokens in type int,
+        - the optional finish reason in type Optional[str].
+
+        Parameters
+        ----------
+        prompts : Sequence[Union[str, List[int]]]
+            The input prompts, each in forms of text string or a list of token ids.
+
+        generation_config : GenerationConfig
+            The generation config shared by all the requests.
+
+        request_id : str
+            The unique identifier (in string) of this batch of requests.
+            The request of the i-th prompt has id "{request_id}-{i}".
+        """
+        # The queue that merges the delta outputs of all the requests.
+        queue: asyncio.Queue[  # pylint: disable=unsubscriptable-object
+            Union[Tuple[int, str, int, Optional[str]], Exception]
+        ] = asyncio.Queue()
+
+        async def forward_outputs(index: int, prompt: Union[str, List[int]]) -> None:
+            try:
+                async for delta_text, num_delta_tokens, finish_reason in self.generate(
+                    prompt, generation_config, request_id=f"{request_id}-{index}"
+                ):
+                    queue.put_nowait((index, delta_text, num_delta_tokens, finish_reason))
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                queue.put_nowait(e)
+
+        # Pause the scheduling so that all requests are admitted together.
+        with self.pause_scheduling():
+            tasks = [
+                asyncio.create_task(forward_outputs(index, prompt))
+                for index, prompt in enumerate(prompts)
+            ]
+            # Yield control so that the tasks submit their requests.
+            await asyncio.sleep(0)
+
+        try:
+            num_unfinished = len(prompts)
+            while num_unfinished > 0:
+                output = await queue.get()
+                if isinstance(output, Exception):
+                    raise output
+                yield output
+                if output[3] is not None:
+                    num_unfinished -= 1
+        finally:
+            # Abort the unfinished requests when the stream is closed early.
+            for task in tasks:
+                task.cancel()
+
     async def abort(self, request_id: str) -> None:
         """Generation abortion interface.
 
@@ -250,7 +346,8 @@ class AsyncThreadedEngine:  # pylint: disable=too-many-instance-attributes
         This callback function uses `call_soon_threadsafe` in asyncio to
         schedule the invocation in the event loop, so that the underlying
         callback logic will be executed asynchronously in the future rather
-        than right now.
+        than right now. This function itself is invoked on the background
+        engine-driving thread, which holds the GIL only during the invocation.
         """
         # Schedule a callback run in the event loop without executing right now.
         # NOTE: This function causes GIL during execution.
@@ -261,31 +358,16 @@ class AsyncThreadedEngine:  # pylint: disable=too-many-instance-attributes
     def _request_stream_callback_impl(self, delta_outputs: List[RequestStreamOutput]) -> None:
         """The underlying implementation of request stream callback."""
         for delta_output in delta_outputs:
-            request_id, delta_tokens, finish_reason = delta_output.unpack()
-            tools = self._request_tools.get(request_id, None)
-            if tools is None:
+            request_id, delta_tokens, delta_text, finish_reason = delta_output.unpack()
+            stream = self._request_tools.get(request_id, None)
+            if stream is None:
                 continue
 
             self.record_event(request_id, event="start callback")
-            stream, text_streamer, stop_handler = tools
-
-            self.record_event(request_id, event="start detokenization")
-            delta_token_ids = delta_tokens.token_ids
-            delta_text = stop_handler.put(text_streamer.put(delta_token_ids))
-            if stop_handler.stop_triggered:
-                finish_reason = "stop"
-                self._abort(request_id)
-            elif finish_reason is not None:
-                delta_text += stop_handler.put(text_streamer.finish())
-                if stop_handler.stop_triggered:
-                    finish_reason = "stop"
-                    self._abort(request_id)
-                else:
-                    delta_text += stop_handler.finish()
-            self.record_event(request_id, event="finish detokenization")
-
             # Push new delta text to the stream.
-            stream.push((delta_text, len(delta_token_ids), finish_reason))
+            # The delta text has been detokenized and checked against stop
+            # strings in the engine.
+            stream.push((delta_text, len(delta_tokens), finish_reason))
             if finish_reason is not None:
                 stream.finish()
                 self._request_tools.pop(request_id, None)
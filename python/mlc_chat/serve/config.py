@@ -1,7 +1,24 @@
 """Configuration dataclasses used in MLC LLM serving"""
 import json
-from dataclasses import asdict, dataclass, field
-from typing import List, Optional
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, List, Optional
+
+
+def _asjson_memoized(config: Any) -> str:
+    """Return the dataclass config in string of JSON format.
+    The JSON string is cached on the config object, and is reused
+    as long as the config fields are not changed since last time.
+    """
+    key = tuple(
+        tuple(value) if isinstance(value, list) else value
+        for value in (getattr(config, config_field.name) for config_field in fields(config))
+    )
+    cached = config.__dict__.get("_json_cache", None)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    json_str = json.dumps(asdict(config))
+    config._json_cache = (key, json_str)  # pylint: disable=protected-access
+    return json_str
 
 
 @dataclass
@@ -65,7 +82,7 @@ class GenerationConfig:  # pylint: disable=too-many-instance-attributes
 
     def asjson(self) -> str:
         """Return the config in string of JSON format."""
-        return json.dumps(asdict(self))
+        return _asjson_memoized(self)
 
     @staticmethod
     def from_json(json_str: str) -> "GenerationConfig":
@@ -97,7 +114,7 @@ class KVCacheConfig:
 
     def asjson(self) -> str:
         """Return the config in string of JSON format."""
-        return json.dumps(asdict(self))
+        return _asjson_memoized(self)
 
     @staticmethod
     def from_json(json_str: str) -> "KVCacheConfig":
@@ -123,7 +140,7 @@ class EngineMode:
 
     def asjson(self) -> str:
         """Return the config in string of JSON format."""
-        return json.dumps(asdict(self))
+        return _asjson_memoized(self)
 
     @staticmethod
     def from_json(json_str: str) -> "EngineMode":
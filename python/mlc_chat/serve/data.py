@@ -1,11 +1,18 @@
 """Classes denoting multi-modality data used in MLC LLM serving"""
 from typing import List
 
+import numpy as np
 import tvm._ffi
 from tvm.runtime import Object
 
 from . import _ffi_api
 
+# The maximum number of token ids that `TokenData.token_ids` reads element
+# by element from the ShapeTuple. Longer token ids are fetched in a single
+# FFI call through an NDArray, whose fixed overhead is amortized only for
+# long sequences. See "tests/python/serve/benchmark_token_data.py".
+_TOKEN_IDS_SHAPE_TUPLE_MAX_LENGTH = 16
+
 
 @tvm._ffi.register_object("mlc.serve.Data")  # pylint: disable=protected-access
 class Data(Object):
@@ -52,5 +59,21 @@ class TokenData(Data):
 
     @property
     def token_ids(self) -> List[int]:
-        """Return the token ids of the TokenData."""
-        return list(_ffi_api.TokenDataGetTokenIds(self))  # type: ignore  # pylint: disable=no-member
+        """Return the token ids of the TokenData.
+        Short token ids (e.g., the delta tokens of a decode step) are read
+        from the ShapeTuple directly, and long ones are fetched at once
+        through `token_ids_array`."""
+        token_ids = _ffi_api.TokenDataGetTokenIds(self)  # type: ignore  # pylint: disable=no-member
+        if len(token_ids) <= _TOKEN_IDS_SHAPE_TUPLE_MAX_LENGTH:
+            return list(token_ids)
+        return self.token_ids_array.tolist()
+
+    @property
+    def token_ids_array(self) -> np.ndarray:
+        """Return the token ids of the TokenData in a 1-D int64 numpy array.
+        The token ids are fetched in a single FFI call, which is cheaper than
+        accessing the token ids one by one for long sequences."""
+        return _ffi_api.TokenDataGetTokenIdsArray(self).numpy()  # type: ignore  # pylint: disable=no-member
+
+    def __len__(self) -> int:
+        return _ffi_api.TokenDataGetLength(self)  # type: ignore  # pylint: disable=no-member
@@ -1,23 +1,29 @@
 """The MLC LLM Serving Engine."""
+import itertools
 import json
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 import tvm
-from tvm.runtime import Device
+from tvm.runtime import Device, ShapeTuple
 
-from mlc_chat.serve import data
 from mlc_chat.support.auto_device import detect_device
 
-from ..chat_module import _get_chat_config, _get_lib_module_path, _get_model_path
-from ..streamer import StopStringHandler, TextStreamer
+from ..chat_module import (
+    ChatConfig,
+    _get_lib_module_path,
+    _get_model_path,
+)
 from ..tokenizer import Tokenizer
 from . import data
 from .config import EngineMode, GenerationConfig, KVCacheConfig
 from .event_trace_recorder import EventTraceRecorder
 from .request import Request, RequestStreamOutput
 
+# The detected devices of device strings, shared by all ModelInfo instances.
+_DETECTED_DEVICES: Dict[str, Device] = {}
+
 
 @dataclass
 class ModelInfo:
@@ -47,10 +53,40 @@ class ModelInfo:
 
     def __post_init__(self):
         if isinstance(self.device, str):
-            self.device = detect_device(self.device)
+            if self.device not in _DETECTED_DEVICES:
+                _DETECTED_DEVICES[self.device] = detect_device(self.device)
+            self.device = _DETECTED_DEVICES[self.device]
         assert isinstance(self.device, Device)
 
 
+@dataclass
+class SpeculativeModelInfo(ModelInfo):
+    """The model info dataclass of a draft model in speculative decoding.
+
+    Parameters
+    ----------
+    spec_draft_length : int
+        The number of tokens the draft model proposes in each
+        speculative step, default 4.
+    """
+
+    spec_draft_length: int = 4
+
+
+def _get_default_engine_mode(models: Union[ModelInfo, List[ModelInfo]]) -> EngineMode:
+    """Return the engine mode used when it is not specified.
+    Speculative decoding is enabled when multiple models are given, where the
+    draft length is taken from the draft model if it is a SpeculativeModelInfo.
+    """
+    if not isinstance(models, list) or len(models) == 1:
+        # The default engine mode: non-speculative
+        return EngineMode()
+    draft_model = models[1]
+    if isinstance(draft_model, SpeculativeModelInfo):
+        return EngineMode(enable_speculative=True, spec_draft_length=draft_model.spec_draft_length)
+    return EngineMode(enable_speculative=True)
+
+
 def _create_tvm_module(
     creator: str, ffi_funcs: Sequence[str], creator_args: Optional[List[Any]] = None
 ) -> Dict[str, Callable]:
@@ -68,13 +104,30 @@ def _process_model_args(
     max_single_sequence_length = int(1e9)
     tokenizer_path: Optional[str] = None
     conv_template_name: Optional[str] = None
+    # The resolved model paths, chat configs, vocabulary sizes and model
+    # libraries, so that models sharing the same identifier (e.g., in
+    # speculative decoding) are only resolved once.
+    model_config_cache: Dict[str, Tuple[str, str, ChatConfig, Optional[int]]] = {}
+    model_lib_path_cache: Dict[Tuple[str, str, str], str] = {}
 
     def _convert_model_info(model: ModelInfo) -> List[Any]:
         nonlocal max_single_sequence_length, tokenizer_path, conv_template_name
 
         device = model.device
-        model_path, config_file_path = _get_model_path(model.model)
-        chat_config = _get_chat_config(config_file_path, user_chat_config=None)
+        if model.model not in model_config_cache:
+            model_path, config_file_path = _get_model_path(model.model)
+            # Parse the config file once for both the chat config and the
+            # vocabulary size, which the chat config does not keep.
+            with open(config_file_path, mode="rt", encoding="utf-8") as file:
+                config_json = json.load(file)
+            chat_config = ChatConfig._from_json(config_json)  # pylint: disable=protected-access
+            model_config_cache[model.model] = (
+                model_path,
+                config_file_path,
+                chat_config,
+                config_json.get("vocab_size", None),
+            )
+        model_path, config_file_path, chat_config, _ = model_config_cache[model.model]
         if chat_config.context_window_size:
             max_single_sequence_length = min(
                 max_single_sequence_length,
@@ -84,41 +137,99 @@ def _process_model_args(
             tokenizer_path = model_path
         if conv_template_name is None:
             conv_template_name = chat_config.conv_template
-        # Try look up model library, and do JIT compile if model library not found.
-        try:
-            model_lib_path = _get_lib_module_path(
-                model=model.model,
-                model_path=model_path,
-                chat_config=chat_config,
-                model_lib_path=model.model_lib_path,
-                device_name=device.MASK2STR[device.device_type],
-                config_file_path=config_file_path,
-            )
-        except FileNotFoundError:
-            from mlc_chat.interface import (  # pylint: disable=import-outside-toplevel
-                jit,
-            )
+        device_name = device.MASK2STR[device.device_type]
+        model_lib_key = (model.model, model.model_lib_path, device_name)
+        if model_lib_key not in model_lib_path_cache:
+            # Try look up model library, and do JIT compile if model library not found.
+            try:
+                model_lib_path_cache[model_lib_key] = _get_lib_module_path(
+                    model=model.model,
+                    model_path=model_path,
+                    chat_config=chat_config,
+                    model_lib_path=model.model_lib_path,
+                    device_name=device_name,
+                    config_file_path=config_file_path,
+                )
+            except FileNotFoundError:
+                from mlc_chat.interface import (  # pylint: disable=import-outside-toplevel
+                    jit,
+                )
 
-            model_lib_path = str(
-                jit.jit(
-                    model_path=Path(model_path),
-                    chat_config=asdict(chat_config),
-                    device=device,
+                model_lib_path_cache[model_lib_key] = str(
+                    jit.jit(
+                        model_path=Path(model_path),
+                        chat_config=asdict(chat_config),
+                        device=device,
+                    )
                 )
-            )
+        model_lib_path = model_lib_path_cache[model_lib_key]
         return [model_lib_path, model_path, device.device_type, device.device_id]
 
     if isinstance(models, list):
-        model_args: List[Any] = sum(
-            (_convert_model_info(model) for model in models),
-            start=[],
+        model_args: List[Any] = list(
+            itertools.chain.from_iterable(_convert_model_info(model) for model in models)
         )
+        # The models run together (e.g., in speculative decoding) must share the
+        # vocabulary, since they exchange token ids with each other.
+        vocab_sizes = {
+            model: vocab_size for model, (_, _, _, vocab_size) in model_config_cache.items()
+        }
+        if len({size for size in vocab_sizes.values() if size is not None}) > 1:
+            raise ValueError(
+                "The input models are expected to have the same vocabulary, but got vocabulary "
+                f"sizes {vocab_sizes}."
+            )
     else:
         model_args = _convert_model_info(models)
 
     return model_args, tokenizer_path, max_single_sequence_length, conv_template_name
 
 
+class _RequestStreamDispatcher:  # pylint: disable=too-few-public-methods
+    """The request stream callback that is registered into the engine
+    once at construction. It collects the delta outputs of the requests
+    submitted by `Engine.generate`, and forwards the delta outputs of
+    all other requests to the user-provided callback.
+
+    Parameters
+    ----------
+    user_callback : Optional[Callable[[List[RequestStreamOutput]], None]]
+        The user-provided request stream callback.
+    """
+
+    def __init__(self, user_callback: Optional[Callable[[List[RequestStreamOutput]], None]]):
+        self.user_callback = user_callback
+        # The output chunks of the requests submitted by `generate`, indexed
+        # by the integer request ids, or None if no `generate` is running.
+        self.generate_outputs: Optional[List[List[Union[str, data.TokenData]]]] = None
+        # Whether to collect the delta tokens instead of the delta texts
+        # for the requests submitted by `generate`.
+        self.collect_tokens = False
+
+    def __call__(self, delta_outputs: List[RequestStreamOutput]) -> None:
+        generate_outputs = self.generate_outputs
+        if generate_outputs is None:
+            # No `generate` is running, all outputs go to the user callback.
+            if self.user_callback is not None:
+                self.user_callback(delta_outputs)
+            return
+
+        collect_tokens = self.collect_tokens
+        user_delta_outputs: List[RequestStreamOutput] = []
+        for delta_output in delta_outputs:
+            # The requests submitted by `generate` have integer ids assigned
+            # by the engine, while other requests have integer id -1.
+            int_id = delta_output.request_int_id
+            if int_id >= 0:
+                generate_outputs[int_id].append(
+                    delta_output.delta_tokens if collect_tokens else delta_output.delta_text
+                )
+            else:
+                user_delta_outputs.append(delta_output)
+        if user_delta_outputs and self.user_callback is not None:
+            self.user_callback(user_delta_outputs)
+
+
 class Engine:
     """The Python interface of request serving engine for MLC LLM.
 
@@ -144,23 +255,27 @@ class Engine:
     kv_cache_config : KVCacheConfig
         The configuration of the paged KV cache.
 
-    request_stream_callback : Optional[Callable[[str, data.TokenData, Optional[str]], None]]
+    request_stream_callback : Optional[Callable[[List[RequestStreamOutput]], None]]
         The provided callback function to handle the generation
-        output. It has the signature of `(str, data.TokenData, bool) -> None`,
-        where
-        - the first string is the request id,
-        - the TokenData contains the generated **delta** token ids since
-        the last invocation of the callback on the specific request,
-        - the optional string value denotes the finish reason if the
-        generation of the request is finished, or None if it has not finished.
-
-        The callback function is optional at construction, but it needs to
-        be set before the engine executing requests. This can be done via
-        the `set_request_stream_callback` method. Otherwise, the engine will raise
-        exception.
+        output. It is invoked once per engine step with the delta outputs
+        of the requests that have new outputs in the step, and is not
+        invoked when no request has new outputs.
+        Check out RequestStreamOutput for the fields of the outputs.
+
+        The callback function is optional. It receives the outputs of all
+        requests except the ones submitted by `generate`, whose outputs are
+        collected and returned by `generate` directly. The callback can be
+        replaced later via the `set_request_stream_callback` method.
+
+        The engine releases the GIL while running on the C++ side, and
+        re-acquires the GIL only to invoke the callback. The callback is
+        invoked on the thread that drives the engine (i.e., the thread
+        calling `step` or `generate`), which may not be the main thread.
 
     engine_mode : Optional[EngineMode]
-        The Engine execution mode.
+        The Engine execution mode. When not specified, speculative decoding
+        is enabled if multiple models are given, with the draft length from
+        the draft model (the second model) if it is a SpeculativeModelInfo.
 
     enable_tracing : bool
         A boolean indicating if to enable event logging for requests.
@@ -185,36 +300,42 @@ class Engine:
             ffi_funcs=[
                 "init",
                 "add_request",
+                "add_requests",
+                "add_requests_raw",
                 "abort_request",
                 "step",
+                "run_until_all_finished",
                 "stats",
                 "reset",
-                "get_request_stream_callback",
-                "set_request_stream_callback",
+                "reset_requests",
             ],
         )
         self.trace_recorder = EventTraceRecorder() if enable_tracing else None
+        self._request_stream_dispatcher = _RequestStreamDispatcher(request_stream_callback)
 
         if engine_mode is None:
-            # The default engine mode: non-speculative
-            engine_mode = EngineMode()
+            engine_mode = _get_default_engine_mode(models)
 
         self._ffi["init"](
             self.max_single_sequence_length,
             tokenizer_path,
             kv_cache_config.asjson(),
             engine_mode.asjson(),
-            request_stream_callback,
+            self._request_stream_dispatcher,
             self.trace_recorder,
             *model_args,
         )
         self.tokenizer = Tokenizer(tokenizer_path)
+        # The counter of `generate` calls, which makes the request ids of
+        # each call unique and distinct from the user-provided request ids.
+        self._generate_call_counter = itertools.count()
 
     def generate(
         self,
         prompts: Union[str, List[str], List[int], List[List[int]]],
         generation_config: Union[GenerationConfig, List[GenerationConfig]],
-    ) -> List[str]:
+        as_tokens: bool = False,
+    ) -> Union[List[str], List[List[int]]]:
         """Generate texts for a list of input prompts.
         Each prompt can be a string or a list of token ids.
         The generation for each prompt is independent.
@@ -233,10 +354,21 @@ class Engine:
             Otherwise, one generation config is required for every
             prompt.
 
+        as_tokens : bool
+            Whether to return the generated token ids instead of the texts.
+            Default is set to False.
+            The generated tokens are not detokenized in this mode unless the
+            generation config has stop strings. Stop strings still end the
+            generation in this mode, but the returned token ids are not
+            truncated at the stop string, and may contain the tokens of the
+            stop string.
+
         Returns
         -------
-        results : List[str]
-            The text generation results, one string for each input prompt.
+        results : Union[List[str], List[List[int]]]
+            The text generation results, one string for each input prompt,
+            or one list of generated token ids for each prompt when
+            `as_tokens` is True.
         """
         if isinstance(prompts, str):
             # `prompts` is a single string.
@@ -251,76 +383,68 @@ class Engine:
             if isinstance(prompts[0], int):
                 # `prompts` is a list of token ids
                 prompts = [prompts]  # type: ignore
+        # Decide the prompt kind once, so that text prompts are passed to
+        # the engine as they are without being inspected one by one.
+        inputs: Sequence[Any] = (
+            prompts if isinstance(prompts[0], str) else [ShapeTuple(prompt) for prompt in prompts]
+        )
 
         num_requests = len(prompts)
-        if not isinstance(generation_config, list):
-            generation_config = [generation_config] * num_requests
-
-        assert (
-            len(generation_config) == num_requests
-        ), "Number of generation config and number of prompts mismatch"
-
-        num_finished_requests = 0
-        outputs: List[str] = []
-        text_streamers: List[TextStreamer] = []
-        stop_handlers: List[StopStringHandler] = []
-        for i in range(num_requests):
-            outputs.append("")
-            text_streamers.append(TextStreamer(self.tokenizer))
-            stop_handlers.append(StopStringHandler(generation_config[i].stop_strs))
-
-        # Save a copy of the original function callback since `generate`
-        # overrides the callback function.
-        # The original callback will be set back later on.
-        original_callback = self._ffi["get_request_stream_callback"]()
-
-        # Define the callback function for request generation results
-        def request_stream_callback(delta_outputs: List[RequestStreamOutput]):
-            nonlocal num_finished_requests
-            for delta_output in delta_outputs:
-                request_id, delta_tokens, finish_reason = delta_output.unpack()
-                rid = int(request_id)
-                text_streamer = text_streamers[rid]
-                stop_handler = stop_handlers[rid]
-
-                delta_text = stop_handler.put(text_streamer.put(delta_tokens.token_ids))
-                if stop_handler.stop_triggered:
-                    finish_reason = "stop"
-                elif finish_reason is not None:
-                    delta_text += stop_handler.put(text_streamer.finish())
-                    if stop_handler.stop_triggered:
-                        finish_reason = "stop"
-                    else:
-                        delta_text += stop_handler.finish()
-
-                outputs[rid] += delta_text
-                if finish_reason is not None:
-                    num_finished_requests += 1
-
-        # Override the callback function in engine.
-        self._ffi["set_request_stream_callback"](request_stream_callback)
-
-        # Add requests to engine.
-        for req_id, (prompt, generation_cfg) in enumerate(zip(prompts, generation_config)):
-            input_data = (
-                data.TextData(prompt)
-                if isinstance(prompt, str)
-                else data.TokenData(prompt)  # type: ignore
-            )
-            self.add_request(
-                Request(
-                    request_id=str(req_id),
-                    inputs=input_data,
-                    generation_config=generation_cfg,
-                )
-            )
-
-        while num_finished_requests != num_requests:
-            self.step()
+        if isinstance(generation_config, list):
+            assert (
+                len(generation_config) == num_requests
+            ), "Number of generation config and number of prompts mismatch"
+            if all(generation_cfg is generation_config[0] for generation_cfg in generation_config):
+                # A single config object is shared by all requests.
+                generation_cfg_jsons = [generation_config[0].asjson()]
+            else:
+                generation_cfg_jsons = [
+                    generation_cfg.asjson() for generation_cfg in generation_config
+                ]
+        else:
+            # The config is shared by all requests, so it is serialized only once.
+            generation_cfg_jsons = [generation_config.asjson()]
+
+        call_id = next(self._generate_call_counter)
+        request_ids = [f"generate-{call_id}-{req_id}" for req_id in range(num_requests)]
+        output_parts: List[List[Union[str, data.TokenData]]] = [[] for _ in range(num_requests)]
+        # Register the output chunks of the requests in the dispatcher, which
+        # collects the delta texts (or tokens) streamed back by the engine.
+        # The engine assigns each request its index in the batch as the
+        # integer id, which directly indexes `output_parts`.
+        dispatcher = self._request_stream_dispatcher
+        dispatcher.collect_tokens = as_tokens
+        dispatcher.generate_outputs = output_parts
 
-        # Restore the callback function in engine.
-        self._ffi["set_request_stream_callback"](original_callback)
-        return outputs
+        try:
+            # Add requests to engine in a single batch. The requests are
+            # constructed in the engine from the raw prompts and configs.
+            # The detokenization is skipped when only tokens are returned.
+            self._ffi["add_requests_raw"](request_ids, inputs, generation_cfg_jsons, not as_tokens)
+
+            # Drive the engine until all the requests above finish.
+            self._ffi["run_until_all_finished"](request_ids)
+        except BaseException:  # pylint: disable=broad-exception-caught
+            # Abort the unfinished requests of this call, so that they do not
+            # keep running in the engine. The ids are unique to this call, so
+            # other requests in the engine are not affected.
+            # Aborting a finished request is a no-op.
+            for request_id in request_ids:
+                self._ffi["abort_request"](request_id)
+            raise
+        finally:
+            dispatcher.generate_outputs = None
+
+        if as_tokens:
+            return [
+                [
+                    token_id
+                    for delta_tokens in parts
+                    for token_id in delta_tokens.token_ids  # type: ignore
+                ]
+                for parts in output_parts
+            ]
+        return ["".join(parts) for parts in output_parts]  # type: ignore
 
     def add_request(self, request: Request) -> None:
         """Add a new request to the engine.
@@ -332,6 +456,38 @@ class Engine:
         """
         self._ffi["add_request"](request)
 
+    def add_requests(self, requests: List[Request]) -> None:
+        """Add a batch of new requests to the engine in a single call.
+
+        Parameters
+        ----------
+        requests : List[Request]
+            The requests to add.
+        """
+        self._ffi["add_requests"](requests)
+
+    def get_request_stream_callback(
+        self,
+    ) -> Optional[Callable[[List[RequestStreamOutput]], None]]:
+        """Return the user-provided request stream callback of the engine."""
+        return self._request_stream_dispatcher.user_callback
+
+    def set_request_stream_callback(
+        self, request_stream_callback: Optional[Callable[[List[RequestStreamOutput]], None]]
+    ) -> None:
+        """Set the user-provided request stream callback of the engine.
+
+        The callback is kept on the Python side and invoked by the request
+        stream dispatcher registered in the engine, so no engine call is
+        needed for the update.
+
+        Parameters
+        ----------
+        request_stream_callback : Optional[Callable[[List[RequestStreamOutput]], None]]
+            The new request stream callback, or None to unset the callback.
+        """
+        self._request_stream_dispatcher.user_callback = request_stream_callback
+
     def abort_request(self, request_id: str) -> None:
         """Abort the generation of the request corresponding to the input request id.
 
@@ -353,6 +509,10 @@ class Engine:
         In the end of certain actions (e.g., decode), the engine will
         check if any request has finished, and will return the
         generation results for those finished requests.
+
+        The GIL is released during the step, so other Python threads can
+        run while the models compute. It is re-acquired only when the
+        request stream callback is invoked.
         """
         self._ffi["step"]()
 
@@ -360,6 +520,12 @@ class Engine:
         """Reset the engine, clean up all running data and statistics."""
         self._ffi["reset"]()
 
+    def reset_requests(self) -> None:
+        """Abort all the running and pending requests, and release their
+        KV cache entries. Different from `reset`, the KV cache and the
+        engine statistics are kept."""
+        self._ffi["reset_requests"]()
+
     def stats(self) -> Dict[str, float]:
         """The engine runtime statistics.
         We collect the following entries:
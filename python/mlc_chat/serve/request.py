@@ -27,6 +27,12 @@ class Request(Object):
     generation_config : GenerationConfig
         The sampling configuration which may contain temperature,
         top_p, repetition_penalty, max_gen_len, etc.
+
+    detokenize : bool
+        Whether to detokenize the generated tokens into the delta text of
+        the request stream outputs. When it is False and the generation
+        config has no stop string, the detokenization is skipped and the
+        delta text is always empty. Default is set to True.
     """
 
     def __init__(
@@ -34,6 +40,7 @@ class Request(Object):
         request_id: str,
         inputs: Union[Data, List[Data]],
         generation_config: GenerationConfig,
+        detokenize: bool = True,
     ):
         if not isinstance(inputs, list):
             inputs = [inputs]
@@ -42,6 +49,7 @@ class Request(Object):
             request_id,
             inputs,
             generation_config.asjson(),
+            detokenize,
         )
 
     @property
@@ -61,7 +69,7 @@ class Request(Object):
 class RequestStreamOutput(Object):
     """The generated delta request output that is streamed back
     through callback stream function.
-    It contains three fields (in order):
+    It contains four fields (in order):
 
     request_id : str
         The id of the request that the function is invoked for.
@@ -70,6 +78,12 @@ class RequestStreamOutput(Object):
         The new generated tokens since the last callback invocation
         for the input request.
 
+    delta_text : str
+        The detokenized text of the new generated tokens, which is
+        UTF-8 valid and has been truncated at the first stop string.
+        It is empty when the request is created with `detokenize=False`
+        and has no stop string.
+
     finish_reason : Optional[str]
         The finish reason of the request when it is finished,
         of None if the request has not finished yet.
@@ -80,7 +94,23 @@ class RequestStreamOutput(Object):
     instantiates this class.
     """
 
-    def unpack(self) -> Tuple[str, TokenData, Optional[str]]:
+    @property
+    def request_int_id(self) -> int:
+        """The integer id of the request, or -1 if the request is not
+        assigned an integer id (e.g., added through `Engine.add_request`)."""
+        return _ffi_api.RequestStreamOutputGetRequestIntId(self)  # type: ignore  # pylint: disable=no-member
+
+    @property
+    def delta_tokens(self) -> TokenData:
+        """The new generated tokens since the last callback invocation."""
+        return _ffi_api.RequestStreamOutputGetDeltaTokens(self)  # type: ignore  # pylint: disable=no-member
+
+    @property
+    def delta_text(self) -> str:
+        """The detokenized text of the new generated tokens."""
+        return _ffi_api.RequestStreamOutputGetDeltaText(self)  # type: ignore  # pylint: disable=no-member
+
+    def unpack(self) -> Tuple[str, TokenData, str, Optional[str]]:
         """Return the fields of the delta output in a tuple.
 
         Returns
@@ -92,9 +122,18 @@ class RequestStreamOutput(Object):
             The new generated tokens since the last callback invocation
             for the input request.
 
+        delta_text : str
+            The detokenized text of the new generated tokens, which is
+            UTF-8 valid and has been truncated at the first stop string.
+
         finish_reason : Optional[str]
             The finish reason of the request when it is finished,
             of None if the request has not finished yet.
         """
         fields = _ffi_api.RequestStreamOutputUnpack(self)  # type: ignore  # pylint: disable=no-member
-        return str(fields[0]), fields[1], str(fields[2]) if fields[2] is not None else None
+        return (
+            str(fields[0]),
+            fields[1],
+            str(fields[2]),
+            str(fields[3]) if fields[3] is not None else None,
+        )
@@ -77,3 +77,51 @@ class StopStringHandler(Object):
     def stop_triggered(self) -> bool:
         """Check if the generation has stopped due to stop string."""
         return _ffi_api.StopStringHandlerStopTriggered(self)  # type: ignore  # pylint: disable=no-member
+
+
+@tvm._ffi.register_object("mlc.StreamProcessor")  # pylint: disable=protected-access
+class StreamProcessor(Object):
+    """The stream processor in MLC LLM, which fuses a text streamer and
+    a stop string handler. It takes input delta tokens one at a time, and
+    return the UTF-8-valid output delta text before stopping due to stop strings.
+    """
+
+    def __init__(self, tokenizer: Tokenizer, stop_strs: List[str]) -> None:
+        self.__init_handle_by_constructor__(
+            _ffi_api.StreamProcessor, tokenizer, stop_strs  # type: ignore  # pylint: disable=no-member
+        )
+
+    def put(self, delta_tokens: Union[List[int], ShapeTuple], is_last: bool = False) -> str:
+        """Put new delta tokens into the processor, and get the output
+        delta text before stopping.
+
+        Parameters
+        ----------
+        delta_tokens : Union[List[int], ShapeTuple]
+            The new tokens to put into the processor.
+
+        is_last : bool
+            Whether the input delta tokens are the last ones of the generation.
+            If so, all the text held by the processor is flushed.
+
+        Returns
+        -------
+        delta_text : str
+            The output delta text.
+        """
+        if isinstance(delta_tokens, list):
+            delta_tokens = ShapeTuple(delta_tokens)
+        return _ffi_api.StreamProcessorPut(  # type: ignore  # pylint: disable=no-member
+            self, delta_tokens, is_last
+        )
+
+    @property
+    def stop_triggered(self) -> bool:
+        """Check if the generation has stopped due to stop string."""
+        return _ffi_api.StreamProcessorStopTriggered(self)  # type: ignore  # pylint: disable=no-member
+
+    @property
+    def finished(self) -> bool:
+        """Check if the processor has finished, i.e., all its text has been
+        flushed or the generation has stopped due to stop string."""
+        return _ffi_api.StreamProcessorFinished(self)  # type: ignore  # pylint: disable=no-member
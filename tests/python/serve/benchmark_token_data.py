@@ -0,0 +1,42 @@
+# pylint: disable=cell-var-from-loop,import-error,missing-docstring,no-member,protected-access
+# type: ignore
+import argparse
+import timeit
+from typing import Callable, List
+
+from mlc_chat.serve import _ffi_api, data
+
+
+def _parse_args():
+    args = argparse.ArgumentParser()
+    args.add_argument("--lengths", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64, 256, 1024])
+    args.add_argument("--number", type=int, default=10000)
+    args.add_argument("--repeat", type=int, default=5)
+    return args.parse_args()
+
+
+def time_per_call_us(func: Callable[[], List[int]], number: int, repeat: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def benchmark(args: argparse.Namespace):
+    """Compare the ways of reading the token ids of a TokenData, for choosing
+    the length threshold between the ShapeTuple and the NDArray paths."""
+    print(f"{'length':>8} {'shape tuple (us)':>18} {'ndarray (us)':>14} {'token_ids (us)':>16}")
+    for length in args.lengths:
+        token_data = data.TokenData(list(range(length)))
+        shape_tuple_time = time_per_call_us(
+            lambda: list(_ffi_api.TokenDataGetTokenIds(token_data)), args.number, args.repeat
+        )
+        ndarray_time = time_per_call_us(
+            lambda: token_data.token_ids_array.tolist(), args.number, args.repeat
+        )
+        token_ids_time = time_per_call_us(lambda: token_data.token_ids, args.number, args.repeat)
+        print(
+            f"{length:>8} {shape_tuple_time:>18.3f} {ndarray_time:>14.3f} {token_ids_time:>16.3f}"
+        )
+
+
+if __name__ == "__main__":
+    ARGS = _parse_args()
+    benchmark(ARGS)
@@ -68,5 +68,88 @@ async def test_engine_generate():
     del async_engine
 
 
+async def test_engine_generate_stream():
+    # Initialize model loading info and KV cache config
+    model = ModelInfo(
+        "dist/Llama-2-7b-chat-hf-q0f16-MLC",
+        model_lib_path="dist/Llama-2-7b-chat-hf-q0f16-MLC/Llama-2-7b-chat-hf-q0f16-MLC-cuda.so",
+    )
+    kv_cache_config = KVCacheConfig(page_size=16)
+    # Create engine
+    async_engine = AsyncThreadedEngine(model, kv_cache_config)
+
+    num_requests = 10
+    max_tokens = 256
+    generation_cfg = GenerationConfig(max_tokens=max_tokens)
+
+    outputs: List[str] = ["" for _ in range(num_requests)]
+    finish_reasons: List[str] = ["" for _ in range(num_requests)]
+    async for index, delta_text, num_delta_tokens, finish_reason in async_engine.generate_stream(
+        prompts[:num_requests], generation_cfg, request_id="batch"
+    ):
+        assert finish_reasons[index] == ""
+        outputs[index] += delta_text
+        if finish_reason is not None:
+            finish_reasons[index] = finish_reason
+    assert all(finish_reason != "" for finish_reason in finish_reasons)
+
+    # Print output.
+    print("All finished")
+    for req_id, output in enumerate(outputs):
+        print(f"Prompt {req_id}: {prompts[req_id]}")
+        print(f"Output {req_id}:{output}\n")
+
+    async_engine.terminate()
+    del async_engine
+
+
+async def test_engine_pause_scheduling():
+    # Initialize model loading info and KV cache config
+    model = ModelInfo(
+        "dist/Llama-2-7b-chat-hf-q0f16-MLC",
+        model_lib_path="dist/Llama-2-7b-chat-hf-q0f16-MLC/Llama-2-7b-chat-hf-q0f16-MLC-cuda.so",
+    )
+    kv_cache_config = KVCacheConfig(page_size=16)
+    # Create engine
+    async_engine = AsyncThreadedEngine(model, kv_cache_config)
+
+    num_requests = 4
+    max_tokens = 32
+    generation_cfg = GenerationConfig(max_tokens=max_tokens)
+
+    outputs: List[str] = ["" for _ in range(num_requests)]
+
+    async def generate_task(prompt: str, request_id: str):
+        rid = int(request_id)
+        async for delta_text, num_delta_tokens, finish_reason in async_engine.generate(
+            prompt, generation_cfg, request_id=request_id
+        ):
+            outputs[rid] += delta_text
+
+    with async_engine.pause_scheduling():
+        with async_engine.pause_scheduling():
+            tasks = [
+                asyncio.create_task(generate_task(prompts[i], request_id=str(i)))
+                for i in range(num_requests)
+            ]
+            # Yield control so that the tasks submit their requests.
+            await asyncio.sleep(0)
+        # Exiting the inner context does not resume the admission.
+        await asyncio.sleep(1)
+        assert all(output == "" for output in outputs)
+        # The abortion of a held-back request takes effect while paused.
+        tasks[0].cancel()
+        await asyncio.sleep(0.1)
+
+    await asyncio.gather(*tasks[1:])
+    assert outputs[0] == ""
+    assert all(output != "" for output in outputs[1:])
+
+    async_engine.terminate()
+    del async_engine
+
+
 if __name__ == "__main__":
     asyncio.run(test_engine_generate())
+    asyncio.run(test_engine_generate_stream())
+    asyncio.run(test_engine_pause_scheduling())
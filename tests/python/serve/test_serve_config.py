@@ -0,0 +1,42 @@
+# pylint: disable=missing-module-docstring,missing-function-docstring
+import json
+
+from mlc_chat.serve.config import EngineMode, GenerationConfig, KVCacheConfig
+
+
+def test_generation_config_asjson_reflects_changes():
+    generation_config = GenerationConfig(max_tokens=16, stop_strs=["a"])
+    json_str = generation_config.asjson()
+    assert json.loads(json_str)["stop_strs"] == ["a"]
+    # The cached JSON is reused when the config is not changed.
+    assert generation_config.asjson() is json_str
+
+    # In-place change of a list field.
+    generation_config.stop_strs.append("b")
+    assert json.loads(generation_config.asjson())["stop_strs"] == ["a", "b"]
+
+    # Field reassignment.
+    generation_config.max_tokens = 32
+    assert json.loads(generation_config.asjson())["max_tokens"] == 32
+    generation_config.stop_token_ids = [2]
+    assert json.loads(generation_config.asjson())["stop_token_ids"] == [2]
+
+    # The JSON string round-trips.
+    assert GenerationConfig.from_json(generation_config.asjson()) == generation_config
+
+
+def test_engine_configs_asjson_reflect_changes():
+    kv_cache_config = KVCacheConfig(page_size=16)
+    assert json.loads(kv_cache_config.asjson())["page_size"] == 16
+    kv_cache_config.page_size = 32
+    assert json.loads(kv_cache_config.asjson())["page_size"] == 32
+
+    engine_mode = EngineMode()
+    assert not json.loads(engine_mode.asjson())["enable_speculative"]
+    engine_mode.enable_speculative = True
+    assert json.loads(engine_mode.asjson())["enable_speculative"]
+
+
+if __name__ == "__main__":
+    test_generation_config_asjson_reflects_changes()
+    test_engine_configs_asjson_reflect_changes()
@@ -87,7 +87,7 @@ def test_engine_basic():
     # Define the callback function for request generation results
     def fcallback(delta_outputs: List[RequestStreamOutput]):
         for delta_output in delta_outputs:
-            request_id, delta_tokens, _ = delta_output.unpack()
+            request_id, delta_tokens, _, _ = delta_output.unpack()
             outputs[int(request_id)] += delta_tokens.token_ids
 
     # Create engine
@@ -102,9 +102,8 @@ def test_engine_basic():
         max_tokens_high=max_tokens + 1,
     )
 
-    # Add all requests to engine
-    for request in requests:
-        engine.add_request(request)
+    # Add all requests to engine in a single batch
+    engine.add_requests(requests)
 
     num_steps = num_requests + max_tokens - 1
     # Run steps
@@ -153,7 +152,7 @@ def test_engine_continuous_batching_1():
         def callback_getter(self) -> Callable[[List[RequestStreamOutput]], None]:
             def fcallback(delta_outputs: List[RequestStreamOutput]):
                 for delta_output in delta_outputs:
-                    request_id, delta_tokens, finish_reason = delta_output.unpack()
+                    request_id, delta_tokens, _, finish_reason = delta_output.unpack()
                     if finish_reason is not None:
                         print(f"Request {request_id} finished at step {self.timer}.")
                     outputs[int(request_id)] += delta_tokens.token_ids
@@ -231,7 +230,7 @@ def test_engine_continuous_batching_2():
         def callback_getter(self) -> Callable[[List[RequestStreamOutput]], None]:
             def fcallback(delta_outputs: List[RequestStreamOutput]):
                 for delta_output in delta_outputs:
-                    request_id, delta_tokens, finish_reason = delta_output.unpack()
+                    request_id, delta_tokens, _, finish_reason = delta_output.unpack()
                     if finish_reason is not None:
                         print(f"Request {request_id} finished at step {self.timer}.")
                     outputs[int(request_id)] += delta_tokens.token_ids
@@ -312,7 +311,7 @@ def test_engine_continuous_batching_3():
         def callback_getter(self) -> Callable[[List[RequestStreamOutput]], None]:
             def fcallback(delta_outputs: List[RequestStreamOutput]):
                 for delta_output in delta_outputs:
-                    request_id, delta_tokens, finish_reason = delta_output.unpack()
+                    request_id, delta_tokens, _, finish_reason = delta_output.unpack()
                     if finish_reason is not None:
                         print(f"Request {request_id} finished at step {self.timer}.")
                         self.finished_requests += 1
@@ -382,9 +381,213 @@ def test_engine_generate():
         print(f"Output {req_id}:{output}\n")
 
 
+def test_engine_generate_stop_str():
+    # Initialize model loading info and KV cache config
+    model = ModelInfo(
+        "dist/Llama-2-7b-chat-hf-q0f16-MLC",
+        model_lib_path="dist/Llama-2-7b-chat-hf-q0f16-MLC/Llama-2-7b-chat-hf-q0f16-MLC-cuda.so",
+    )
+    kv_cache_config = KVCacheConfig(page_size=16)
+    # Create engine
+    engine = Engine(model, kv_cache_config)
+
+    num_requests = 10
+    max_tokens = 256
+    stop_strs = [".", "\n"]
+
+    # Generate output. The engine is expected to truncate each
+    # output before the first stop string.
+    outputs = engine.generate(
+        prompts[:num_requests], GenerationConfig(max_tokens=max_tokens, stop_strs=stop_strs)
+    )
+    for req_id, output in enumerate(outputs):
+        print(f"Prompt {req_id}: {prompts[req_id]}")
+        print(f"Output {req_id}:{output}\n")
+        assert all(stop_str not in output for stop_str in stop_strs)
+
+
+def test_engine_callback_exception():
+    """Test that the engine keeps working after the request stream
+    callback raises an exception on the step where requests finish,
+    either by length or by hitting a stop string."""
+
+    # Initialize model loading info and KV cache config
+    model = ModelInfo(
+        "dist/Llama-2-7b-chat-hf-q0f16-MLC",
+        model_lib_path="dist/Llama-2-7b-chat-hf-q0f16-MLC/Llama-2-7b-chat-hf-q0f16-MLC-cuda.so",
+    )
+    kv_cache_config = KVCacheConfig(page_size=16)
+
+    num_requests = 4
+    max_tokens = 32
+    finish_reasons = {}
+    num_raises = [1]
+
+    # Define the callback function which raises an exception once,
+    # on the first step where any request finishes.
+    def fcallback(delta_outputs: List[RequestStreamOutput]):
+        for delta_output in delta_outputs:
+            request_id, _, _, finish_reason = delta_output.unpack()
+            if finish_reason is not None:
+                assert request_id not in finish_reasons
+                finish_reasons[request_id] = finish_reason
+        if num_raises[0] > 0 and len(finish_reasons) > 0:
+            num_raises[0] -= 1
+            raise RuntimeError("Intended exception in callback")
+
+    # Create engine
+    engine = Engine(model, kv_cache_config, request_stream_callback=fcallback)
+
+    def run_requests(requests: List[Request], expected_finish_reason: str):
+        finish_reasons.clear()
+        num_raises[0] = 1
+        for request in requests:
+            engine.add_request(request)
+
+        raised = False
+        for _ in range(num_requests + max_tokens):
+            try:
+                engine.step()
+            except Exception:  # pylint: disable=broad-exception-caught
+                raised = True
+        assert raised
+        # Every request finishes exactly once, including the ones which
+        # finished on the step where the callback raised.
+        assert len(finish_reasons) == num_requests
+        assert all(reason == expected_finish_reason for reason in finish_reasons.values())
+        # The finished requests are removed from the engine.
+        engine.step()
+
+    # Case 1. The requests finish by length.
+    run_requests(
+        create_requests(num_requests, max_tokens_low=max_tokens // 2, max_tokens_high=max_tokens),
+        expected_finish_reason="length",
+    )
+
+    # Case 2. The requests finish by hitting stop strings.
+    generation_config = GenerationConfig(
+        temperature=0.0, max_tokens=4 * max_tokens, stop_strs=[" ", "."]
+    )
+    run_requests(
+        [
+            Request(str(i), data.TextData(prompt), generation_config)
+            for i, prompt in enumerate(prompts[:num_requests])
+        ],
+        expected_finish_reason="stop",
+    )
+
+
+def test_engine_generate_as_tokens():
+    # Initialize model loading info and KV cache config
+    model = ModelInfo(
+        "dist/Llama-2-7b-chat-hf-q0f16-MLC",
+        model_lib_path="dist/Llama-2-7b-chat-hf-q0f16-MLC/Llama-2-7b-chat-hf-q0f16-MLC-cuda.so",
+    )
+    kv_cache_config = KVCacheConfig(page_size=16)
+    # Create engine
+    engine = Engine(model, kv_cache_config)
+
+    num_requests = 10
+    max_tokens = 64
+    # Greedy decoding so that the two generations below are identical.
+    generation_config = GenerationConfig(temperature=0.0, max_tokens=max_tokens)
+
+    # Generate output texts and output token ids.
+    output_texts = engine.generate(prompts[:num_requests], generation_config)
+    output_token_ids = engine.generate(prompts[:num_requests], generation_config, as_tokens=True)
+    assert len(output_token_ids) == num_requests
+    for req_id, (output_text, token_ids) in enumerate(zip(output_texts, output_token_ids)):
+        assert isinstance(token_ids, list)
+        assert all(isinstance(token_id, int) for token_id in token_ids)
+        assert 0 < len(token_ids) <= max_tokens
+        print(f"Prompt {req_id}: {prompts[req_id]}")
+        print(f"Output {req_id}:{output_text}\n")
+        assert engine.tokenizer.decode(token_ids) == output_text
+
+    # Requests added through the low-level API can opt out of detokenization.
+    outputs = [[] for _ in range(num_requests)]
+
+    def fcallback(delta_outputs: List[RequestStreamOutput]):
+        for delta_output in delta_outputs:
+            request_id, delta_tokens, delta_text, _ = delta_output.unpack()
+            assert delta_text == ""
+            outputs[int(request_id)] += delta_tokens.token_ids
+
+    engine.set_request_stream_callback(fcallback)
+    requests = [
+        Request(str(req_id), data.TextData(prompt), generation_config, detokenize=False)
+        for req_id, prompt in enumerate(prompts[:num_requests])
+    ]
+    engine.add_requests(requests)
+    for _ in range(num_requests + max_tokens):
+        engine.step()
+    assert outputs == output_token_ids
+
+
+def test_engine_reset_requests():
+    """Test engine `reset_requests`.
+
+    - Run `generate` to accumulate the statistics.
+    - Add all requests to the engine, and run a few steps.
+    - Reset the requests. The statistics are expected to be kept.
+    - Run `generate` on the same engine again.
+    """
+
+    # Initialize model loading info and KV cache config
+    model = ModelInfo(
+        "dist/Llama-2-7b-chat-hf-q0f16-MLC",
+        model_lib_path="dist/Llama-2-7b-chat-hf-q0f16-MLC/Llama-2-7b-chat-hf-q0f16-MLC-cuda.so",
+    )
+    kv_cache_config = KVCacheConfig(page_size=16)
+
+    num_requests = 10
+    max_tokens = 256
+
+    # Define the callback function for request generation results
+    def fcallback(delta_outputs: List[RequestStreamOutput]):
+        pass
+
+    # Create engine
+    engine = Engine(model, kv_cache_config, request_stream_callback=fcallback)
+
+    # Generate with finished requests, so that the statistics are non-empty.
+    engine.generate(prompts[:num_requests], GenerationConfig(max_tokens=32))
+
+    # Create requests
+    requests = create_requests(
+        num_requests, max_tokens_low=max_tokens, max_tokens_high=max_tokens + 1
+    )
+
+    # Add all requests to engine
+    engine.add_requests(requests)
+
+    # Run a few steps, where no request finishes.
+    num_steps = num_requests + 4
+    for step in range(num_steps):
+        engine.step()
+
+    stats = engine.stats()
+    assert stats["total_prefill_tokens"] > 0
+    assert stats["engine_total_decode_time"] > 0
+
+    # Reset the requests. The statistics are kept.
+    engine.reset_requests()
+    assert engine.stats() == stats
+
+    # The engine is expected to work normally afterwards.
+    outputs = engine.generate(prompts[:num_requests], GenerationConfig(max_tokens=32))
+    assert len(outputs) == num_requests
+    assert all(len(output) > 0 for output in outputs)
+    assert engine.stats()["engine_total_decode_time"] > stats["engine_total_decode_time"]
+
+
 if __name__ == "__main__":
     test_engine_basic()
     test_engine_continuous_batching_1()
     test_engine_continuous_batching_2()
     test_engine_continuous_batching_3()
     test_engine_generate()
+    test_engine_generate_stop_str()
+    test_engine_callback_exception()
+    test_engine_generate_as_tokens()
+    test_engine_reset_requests()
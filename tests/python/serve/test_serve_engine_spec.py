@@ -13,7 +13,7 @@ from mlc_chat.serve import (
     RequestStreamOutput,
     data,
 )
-from mlc_chat.serve.engine import ModelInfo
+from mlc_chat.serve.engine import ModelInfo, SpeculativeModelInfo
 
 prompts = [
     "What is the meaning of life?",
@@ -93,7 +93,7 @@ def test_engine_basic():
     # Define the callback function for request generation results
     def fcallback(delta_outputs: List[RequestStreamOutput]):
         for delta_output in delta_outputs:
-            request_id, delta_tokens, _ = delta_output.unpack()
+            request_id, delta_tokens, _, _ = delta_output.unpack()
             outputs[int(request_id)] += delta_tokens.token_ids
 
     # Create engine
@@ -164,7 +164,7 @@ def test_engine_continuous_batching_1():
         def callback_getter(self) -> Callable[[List[RequestStreamOutput]], None]:
             def fcallback(delta_outputs: List[RequestStreamOutput]):
                 for delta_output in delta_outputs:
-                    request_id, delta_tokens, finish_reason = delta_output.unpack()
+                    request_id, delta_tokens, _, finish_reason = delta_output.unpack()
                     if finish_reason is not None:
                         print(f"Request {request_id} finished at step {self.timer}.")
                     outputs[int(request_id)] += delta_tokens.token_ids
@@ -230,6 +230,35 @@ def test_engine_generate():
         print(f"Output {req_id}:{output}\n")
 
 
+def test_engine_generate_default_speculative_mode():
+    # Initialize model loading info and KV cache config
+    ssm = SpeculativeModelInfo(
+        "dist/Llama-2-7b-chat-hf-q4f16_1-MLC",
+        model_lib_path="dist/Llama-2-7b-chat-hf-q4f16_1-MLC/Llama-2-7b-chat-hf-q4f16_1-MLC-cuda.so",
+        spec_draft_length=5,
+    )
+    model = ModelInfo(
+        "dist/Llama-2-7b-chat-hf-q0f16-MLC",
+        model_lib_path="dist/Llama-2-7b-chat-hf-q0f16-MLC/Llama-2-7b-chat-hf-q0f16-MLC-cuda.so",
+    )
+    kv_cache_config = KVCacheConfig(page_size=16)
+    # Create engine without engine mode, where speculative decoding
+    # is enabled by default for multiple models.
+    engine = Engine([model, ssm], kv_cache_config)
+
+    num_requests = 10
+    max_tokens = 256
+
+    # Generate output.
+    outputs = engine.generate(prompts[:num_requests], GenerationConfig(max_tokens=max_tokens))
+    for req_id, output in enumerate(outputs):
+        print(f"Prompt {req_id}: {prompts[req_id]}")
+        print(f"Output {req_id}:{output}\n")
+
+    stats = engine.stats()
+    assert stats["total_draft_tokens"] > 0
+
+
 def test_engine_efficiency():
     """Test engine speculative decoding efficiency."""
 
@@ -253,7 +282,7 @@ def test_engine_efficiency():
     # Define the callback function for request generation results
     def fcallback(delta_outputs: List[RequestStreamOutput]):
         for delta_output in delta_outputs:
-            request_id, delta_tokens, _ = delta_output.unpack()
+            request_id, delta_tokens, _, _ = delta_output.unpack()
             outputs[int(request_id)] += delta_tokens.token_ids
 
     # Create engine
@@ -324,7 +353,7 @@ def test_engine_spec_efficiency():
     # Define the callback function for request generation results
     def fcallback(delta_outputs: List[RequestStreamOutput]):
         for delta_output in delta_outputs:
-            request_id, delta_tokens, _ = delta_output.unpack()
+            request_id, delta_tokens, _, _ = delta_output.unpack()
             outputs[int(request_id)] += delta_tokens.token_ids
 
     # Create engine
@@ -366,5 +395,6 @@ if __name__ == "__main__":
     test_engine_basic()
     test_engine_continuous_batching_1()
     test_engine_generate()
+    test_engine_generate_default_speculative_mode()
     test_engine_efficiency()
     test_engine_spec_efficiency()
@@ -20,7 +20,7 @@ from typing import List, Tuple
 
 import pytest
 
-from mlc_chat.streamer import StopStringHandler, TextStreamer
+from mlc_chat.streamer import StopStringHandler, StreamProcessor, TextStreamer
 from mlc_chat.tokenizer import Tokenizer
 
 # fmt: off
@@ -117,6 +117,78 @@ def test_stop_str_handler_not_stop(
     assert total_text == DECODED_PARAGRAPH
 
 
+@pytest.mark.parametrize("stop_strs", [[" 🤔"], ["^^"], []])
+def test_stream_processor(
+    llama_tokenizer_path: str, stop_strs: List[str]
+):  # pylint: disable=redefined-outer-name
+    tokenizer = Tokenizer(llama_tokenizer_path)
+    expected_text = stop_handler_process_tokens(
+        StopStringHandler(stop_strs), TextStreamer(tokenizer), para_input_tokens
+    )
+
+    stream_processor = StreamProcessor(tokenizer, stop_strs)
+    total_text = ""
+    for i, token in enumerate(para_input_tokens):
+        total_text += stream_processor.put([token], is_last=i == len(para_input_tokens) - 1)
+        if stream_processor.stop_triggered:
+            break
+    assert total_text == expected_text
+
+
+def _expected_stop_str_output(text: str, stop_strs: List[str], chunk_size: int) -> Tuple[str, bool]:
+    """The reference stop string handling, which searches all stop strings
+    in the text received so far after each chunk. It returns the output text
+    and whether any stop string is hit."""
+    for end in range(chunk_size, len(text) + chunk_size, chunk_size):
+        received_text = text[:end]
+        positions = [received_text.find(stop_str) for stop_str in stop_strs]
+        positions = [pos for pos in positions if pos != -1]
+        if positions:
+            return received_text[: min(positions)], True
+    return text, False
+
+
+stop_str_handler_cases = [
+    # A stop string is a substring of another stop string.
+    (["abcd", "bc"], "xxabcdyy"),
+    (["abcd", "bc"], "xxabceyy"),
+    (["bc", "abcd"], "xxabcdyy"),
+    (["abcd", "bcd"], "xxabcbcdyy"),
+    # A stop string is a prefix or a suffix of another stop string.
+    (["ab", "abc"], "xxabcyy"),
+    (["abc", "ab"], "xxabyy"),
+    (["abc", "c"], "xxabyycz"),
+    # Overlapping partial matches.
+    (["aab"], "aaaaab"),
+    (["abab"], "abaababab"),
+    # Single-character stop strings.
+    (["."], "Hello. World."),
+    (["!", "."], "Hello world!"),
+    (["."], "No stop here"),
+    # Multi-byte UTF-8 stop strings.
+    ([" 🤔"], "emoji 👋 and emoji 🤔 here"),
+    (["🤔", "👋"], "emoji 👋 and 🤔"),
+]
+
+
+@pytest.mark.parametrize("stop_strs, text", stop_str_handler_cases)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 100])
+def test_stop_str_handler_split_text(stop_strs: List[str], text: str, chunk_size: int):
+    stop_handler = StopStringHandler(stop_strs)
+    total_text = ""
+    # Put the text in chunks, so that stop strings span multiple `put` calls.
+    for begin in range(0, len(text), chunk_size):
+        total_text += stop_handler.put(text[begin : begin + chunk_size])
+        if stop_handler.stop_triggered:
+            break
+    else:
+        total_text += stop_handler.finish()
+
+    expected_text, expected_stop = _expected_stop_str_output(text, stop_strs, chunk_size)
+    assert stop_handler.stop_triggered == expected_stop
+    assert total_text == expected_text
+
+
 emoji_tokens_expected_result = [
     # HF: "�����", SentencePiece: "�👀"
     ([177, 243, 162, 148, 131], ("�����", "�👀")),
@@ -149,6 +221,12 @@ if __name__ == "__main__":
     test_text_streamer(tokenizer_path)
     test_stop_str_handler_stop(tokenizer_path)
     test_stop_str_handler_not_stop(tokenizer_path)
+    for stop_strs_ in [[" 🤔"], ["^^"], []]:
+        test_stream_processor(tokenizer_path, stop_strs_)
+
+    for stop_strs_, text_ in stop_str_handler_cases:
+        for chunk_size_ in [1, 2, 3, 100]:
+            test_stop_str_handler_split_text(stop_strs_, text_, chunk_size_)
 
     for tokens_and_res in emoji_tokens_expected_result:
         test_text_streamer_emojis(tokenizer_path, tokens_and_res)